@@ -1,14 +1,14 @@
 #! python3
 
 # can't do relative import
+import logging
 import sys
 from pathlib import PurePath
 
 this_path = PurePath(__file__)
 ext_path = this_path.parents[3]
 sys.path.append(str(ext_path.parent))  # parent of the extension dir
-from housingdna.extension import get_revit_info, get_model, save_json
-
+from housingdna.extension import get_revit_info, get_model, save_json, save_revit_info
 
 # can't import pyrevit from cpython. yet.
 # from pyrevit import forms
@@ -29,7 +29,9 @@ r = get_revit_info(__revit__)  # type: ignore
 default_name = (
     PurePath(r.doc_name if r.doc_name else "pyrevit").with_suffix(".json").name
 )
-model = get_model(r)
+# rooms of the openings revit couldn't relate are found by location
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+model = get_model(r, locate=True)
 
 # strip null characters from pyrevit input
 raw_name = input(f"Filename to save (default: {default_name})?").strip("\x00")
@@ -37,4 +39,6 @@ filename = PurePath(raw_name if raw_name else default_name).with_suffix(".json")
 print(f"Saving to {filename} ...")
 
 save_json(model, filename)
+# what was read from revit, to build the model again with `housingdna replay`
+save_revit_info(r, PurePath(filename).with_suffix(".json.gz"))
 print(model)
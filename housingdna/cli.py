@@ -15,15 +15,49 @@ if __name__ == "__main__" and __package__ is None:
             package_path += "."
     __package__ = package_path
 
+import argparse
 from pathlib import Path, PurePath
-from typing import List, Tuple, Union
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
 from .file import get_model
+from .model import RevitInfo
 from .rules import analyze_housing_dna
 from .rules.type import N, E, A
 
 
-def main():
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(prog="housingdna")
+    commands = parser.add_subparsers(dest="command")
+    replay = commands.add_parser(
+        "replay", help="build house models again from saved Revit snapshots"
+    )
+    replay.add_argument("paths", nargs="+", help="snapshot files or directories")
+    replay.add_argument("--analytic", action="store_true")
+    replay.add_argument("--workers", type=int, default=1)
+    replay.add_argument("--repeat", type=int, default=1, help="runs for each timing")
+    replay.add_argument("--save", metavar="DIR", help="where to save house models")
+    extract = commands.add_parser(
+        "extract", help="read Revit snapshots back through a stand-in Revit API"
+    )
+    extract.add_argument("paths", nargs="+", help="snapshot files or directories")
+    extract.add_argument(
+        "--latency", type=float, default=0.0, help="seconds for each call to Revit"
+    )
+    extract.add_argument("--top", type=int, default=5, help="most called APIs")
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        replay_snapshots(
+            args.paths, args.analytic, args.workers, args.repeat, args.save
+        )
+    elif args.command == "extract":
+        extract_snapshots(args.paths, args.latency, args.top)
+    else:
+        analyze_models()
+
+
+def analyze_models():
     mod_path = Path(__file__).parent
     default_path = mod_path / "models"
 
@@ -43,6 +77,67 @@ def main():
         to_txt_pair(nodes, edges, json_path)
 
 
+def snapshot_paths(paths: Iterable[Union[str, Path]]) -> List[Path]:
+    """Snapshot files, and those in the directories (*.json or *.json.gz)."""
+    found: List[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.extend(sorted([*path.glob("*.json"), *path.glob("*.json.gz")]))
+        else:
+            found.append(path)
+    return found
+
+
+def replay_snapshots(
+    paths: Iterable[Union[str, Path]],
+    analytic: bool = False,
+    workers: int = 1,
+    repeat: int = 1,
+    save_dir: Optional[Union[str, Path]] = None,
+) -> None:
+    """Builds house models from Revit snapshots, as the extension would in
+    Revit, and prints the best time of building each."""
+    from . import extension
+
+    for path in snapshot_paths(paths):
+        r = RevitInfo.from_json(path)
+        times: List[float] = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            model = extension.get_model(r, analytic=analytic, workers=workers)
+            times.append(time.perf_counter() - start)
+        print(
+            f"{path.name}: {len(model.rooms)} rooms, {len(model.glazings)} glazings,"
+            f" {len(model.room_glazing_relations)} relations"
+            f" in {min(times):.3f}s"
+        )
+        if save_dir:
+            name = path.name[: -len(".gz")] if path.suffix == ".gz" else path.name
+            model.to_json(Path(save_dir) / PurePath(name).with_suffix(".json"))
+
+
+def extract_snapshots(
+    paths: Iterable[Union[str, Path]], latency: float = 0.0, top: int = 5
+) -> None:
+    """Runs revitapi.get_revit_info on a stand-in Revit of each snapshot, and
+    prints its time and the calls it made to Revit."""
+    from . import revitapi
+    from .fakerevit import fake_revit, installed
+
+    for path in snapshot_paths(paths):
+        uiapp = fake_revit(RevitInfo.from_json(path))
+        with installed(latency) as bridge:
+            start = time.perf_counter()
+            revitapi.get_revit_info(uiapp)
+            seconds = time.perf_counter() - start
+        print(
+            f"{path.name}: {sum(bridge.calls.values())} calls to Revit"
+            f" in {seconds:.3f}s"
+        )
+        for name, count in bridge.calls.most_common(top):
+            print(f"    {count:8d} {name}")
+
+
 def to_txt_pair(
     nodes: List[Tuple[N, A]],
     edges: List[Tuple[E, A]],
@@ -11,11 +11,14 @@ if __name__ == "__main__" and __package__ is None:
     sys.path.append(str(package_path.parent))
 
 
+from functools import cached_property
 from itertools import combinations
+import logging
 import math
 from typing import (
     Any,
     Collection,
+    Dict,
     List,
     Mapping,
     Optional,
@@ -27,11 +30,19 @@ from typing import (
 import numpy as np
 from pathlib import Path, PurePath
 from shapely.geometry import Point, LineString, Polygon
+from shapely.geometry.base import BaseGeometry
 from shapely.geometry.geo import box
+from shapely.prepared import prep
+from shapely.strtree import STRtree
+import warnings
 
+from housingdna import geometry
+from housingdna.rules.graph import UnionFind
+from housingdna.rules.name import is_common
 from housingdna.model import (
     Direction,
     House,
+    HouseGeometry,
     Length,
     Glazing,
     RevitInfo,
@@ -42,7 +53,9 @@ from housingdna.model import (
 )
 
 if __name__ != "__main__":
-    from housingdna.revitapi import get_revit_info  # type:ignore
+    from housingdna.revitapi import get_revit_info  # type: ignore
+
+logger = logging.getLogger(__name__)
 
 
 def save_json(
@@ -54,6 +67,16 @@ def save_json(
     model.to_json(path)
 
 
+def save_revit_info(
+    r: RevitInfo,
+    filename: Union[str, Path, PurePath],
+    save_dir: Union[str, Path, PurePath] = "snapshots/",
+) -> None:
+    """Saves what was read from Revit, to build the model again without Revit."""
+    path = PurePath(__file__).parent / save_dir / filename
+    r.to_json(path)
+
+
 def to_polygon(rings: Sequence[Sequence[Tuple[float, float]]]) -> Polygon:
     return Polygon(rings[0], rings[1:])
 
@@ -61,42 +84,95 @@ def to_polygon(rings: Sequence[Sequence[Tuple[float, float]]]) -> Polygon:
 def to_segmented_lines(
     polyline: Sequence[Tuple[float, float]], true_north: float = 0
 ) -> Optional[List[Tuple[Direction, LineString]]]:
+    """Split a polyline into lines of the same 8-direction.
+
+    >>> lines = to_segmented_lines([(0, 0), (0, 1), (0, 2), (1, 2), (1, 3)])
+    >>> [(d.name, list(line.coords)) for d, line in lines]  # doctest: +NORMALIZE_WHITESPACE
+    [('NORTH', [(0.0, 0.0), (0.0, 1.0), (0.0, 2.0)]),
+     ('EAST', [(0.0, 2.0), (1.0, 2.0)]),
+     ('NORTH', [(1.0, 2.0), (1.0, 3.0)])]
+    """
+    segs = to_segmented_coords(polyline, true_north)
+    if segs is None:
+        return None
+    return [(direction, LineString(coords)) for direction, coords in segs]
+
+
+def to_segmented_coords(
+    polyline: Sequence[Tuple[float, float]], true_north: float = 0
+) -> Optional[List[Tuple[Direction, np.ndarray]]]:
+    """Split a polyline into N x 2 points of the same 8-direction, the same
+    as to_segmented_lines without making LineStrings.
+
+    >>> segs = to_segmented_coords([(0, 0), (0, 1), (1, 1)])
+    >>> [(d.name, coords.tolist()) for d, coords in segs]
+    [('NORTH', [[0.0, 0.0], [0.0, 1.0]]), ('EAST', [[0.0, 1.0], [1.0, 1.0]])]
+    """
     if len(polyline) <= 1:
         return None
 
-    # assuming number of points >= 2, last index >= 1
-    first_i = 0  # set to the first point
-    # calculate bearing of the advance
-    bearing = (
-        azimuth(polyline[0], polyline[1])  # between first two points
-        - true_north  # make the true north == 0
+    # directions of every advance at once
+    coords = np.asarray(polyline, dtype=float)
+    codes = direction_codes(coords[:-1], coords[1:], true_north)
+
+    # advances where the direction changes start a new line
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1])
+    ends = np.concatenate([starts[1:], [len(codes)]])
+    # last point of a line is shared with the next line
+    return [
+        (DIRECTION_TABLE[codes[start]], coords[start : end + 1])
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+# Direction of each direction code, which is the value of the Direction
+DIRECTION_TABLE = np.array([None, *(Direction(v) for v in range(1, 9))], dtype=object)
+
+
+def azimuths(points1: np.ndarray, points2: np.ndarray) -> np.ndarray:
+    """azimuths between N x 2 arrays of points in radian 0 to 2pi.
+
+    >>> azimuths(np.array([[0, 0], [0, 0]]), np.array([[0, 1], [-1, 0]]))
+    array([0.        , 4.71238898])
+    """
+    points1 = np.asarray(points1, dtype=float).reshape(-1, 2)
+    points2 = np.asarray(points2, dtype=float).reshape(-1, 2)
+    angles = np.arctan2(points2[:, 0] - points1[:, 0], points2[:, 1] - points1[:, 1])
+    return np.where(angles >= 0, angles, angles + 2 * math.pi)
+
+
+def to_direction_codes(bearings: np.ndarray) -> np.ndarray:
+    """8-direction codes of bearings in radian, with the true north == 0.
+
+    >>> to_direction_codes(np.array([0, math.pi / 2, math.pi, -math.pi / 4]))
+    array([1, 3, 5, 8], dtype=int8)
+    """
+    return (
+        np.round(  # round to closest 1/8 rotations
+            (
+                (np.asarray(bearings) / (2 * math.pi))  # in rotations (from radian)
+                + 1  # add 1 rotation to make it always positive
+            )
+            * 8  # in 1/8 rotations
+        ).astype(np.int64)
+        % 8  # remove full rotations, which could exist from adding 1 full rotation
+        + 1  # make the true north == 1 instead of 0 (rotation)
+    ).astype(np.int8)
+
+
+def direction_codes(
+    points1: np.ndarray, points2: np.ndarray, true_north: float = 0
+) -> np.ndarray:
+    """8-direction codes of the bearings from N x 2 points to N x 2 points.
+
+    >>> origins = np.array([[0, 0], [0, 0]])
+    >>> codes = direction_codes(origins, np.array([[1, 1], [0, -1]]))
+    >>> DIRECTION_TABLE[codes].tolist()
+    [<Direction.NORTHEAST: 2>, <Direction.SOUTH: 5>]
+    """
+    return to_direction_codes(
+        azimuths(points1, points2) - true_north  # make the true north == 0
     )
-    # into 8-direction
-    last_direction = to_direction(bearing)
-    if len(polyline) == 2:
-        # return the whole line
-        return [(last_direction, LineString(polyline))]
-
-    # assuming number of points >= 3, last index >= 2
-    lines: List[Tuple[Direction, LineString]] = []
-    for i in range(2, len(polyline)):
-        # calculate bearing of the advance
-        bearing = (
-            azimuth(polyline[i - 1], polyline[i])  # between (currently) last two points
-            - true_north  # make the true north == 0
-        )
-        # into 8-direction
-        direction = to_direction(bearing)
-        if direction != last_direction:
-            # create a linestring excluding this point
-            lines.append((last_direction, LineString(polyline[first_i:i])))
-            # last point will be shared between two linestrings
-            first_i = i - 1
-            # this bearing for next linestring
-            last_direction = direction
-    # for the last linestring
-    lines.append((last_direction, LineString(polyline[first_i:])))
-    return lines
 
 
 def azimuth(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
@@ -113,25 +189,11 @@ def azimuth(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
     >>> azimuth((0, 0), (-1, 0))  # west == 3/2*pi  # doctest: +ELLIPSIS
     4.71...
     """
-    x1, y1 = point1
-    x2, y2 = point2
-
-    angle: float = np.arctan2(x2 - x1, y2 - y1)
-    return angle if angle >= 0 else angle + 2 * math.pi
+    return float(azimuths(np.array(point1), np.array(point2))[0])
 
 
 def to_direction(bearing: float) -> Direction:
-    return Direction(
-        round(
-            (
-                (bearing / (2 * math.pi))  # in rotations (from radian)
-                + 1  # add 1 rotation to make it always positive
-            )
-            * 8  # in 1/8 rotations
-        )  # round to closest 1/8 rotations
-        % 8  # remove full rotations, which could exist from adding 1 full rotation
-        + 1  # make the true north == 1 instead of 0 (rotation)
-    )  # convert it to Direction
+    return DIRECTION_TABLE[to_direction_codes(np.array([bearing]))[0]]
 
 
 def center_of_overlap(*polygons: Polygon) -> Optional[Tuple[float, float]]:
@@ -149,6 +211,136 @@ def center_of_overlap(*polygons: Polygon) -> Optional[Tuple[float, float]]:
     return None
 
 
+class RoomIndex:
+    """Spatial index (STRtree) of room polygons, to find rooms by location.
+
+    >>> index = RoomIndex({1: box(0, 0, 10, 10), 2: box(10, 0, 20, 10)})
+    >>> index.candidates(box(9, 4, 11, 6))
+    [1, 2]
+    >>> index.overlapping(box(10, 4, 11, 6))
+    [2]
+    >>> index.overlapping(Point(30, 30))
+    []
+    """
+
+    def __init__(self, polygons: Mapping[int, Polygon]):
+        self.rooms: List[int] = list(polygons)
+        self.polygons: List[Polygon] = [polygons[room] for room in self.rooms]
+        self.index: Dict[int, int] = {room: i for i, room in enumerate(self.rooms)}
+        with warnings.catch_warnings():
+            # shapely 1.8 warns of the changes in 2.0, which are handled below
+            warnings.simplefilter("ignore")
+            self.tree = STRtree(self.polygons)
+
+    def _slots(self, geometry: BaseGeometry) -> List[int]:
+        if not self.polygons:
+            return []
+        # indices of the polygons, from query_items in shapely 1.8
+        # or from query in shapely 2.0
+        query = getattr(self.tree, "query_items", self.tree.query)
+        return sorted(int(i) for i in query(geometry))
+
+    def candidates(self, geometry: BaseGeometry) -> List[int]:
+        """Rooms with their bounding box intersecting that of the geometry."""
+        return [self.rooms[i] for i in self._slots(geometry)]
+
+    def overlapping(self, geometry: BaseGeometry) -> List[int]:
+        """Rooms sharing some area with the geometry."""
+        return [
+            self.rooms[i]
+            for i in self._slots(geometry)
+            if self.polygons[i].intersection(geometry).area
+        ]
+
+
+def located_rel_rooms(r: RevitInfo, room_index: RoomIndex) -> Dict[int, Set[int]]:
+    """Related rooms of each opening, filled by location where Revit has none.
+
+    A point object (door or window) is related to the rooms around its point,
+    and a linear object (curtain wall or separation line) to the rooms along
+    its line, both within 1 foot.
+    """
+    rel_rooms = dict(r.rel_rooms)
+    n_filled = 0
+    n_far = 0
+    for id_ in r.doors + r.windows + r.curtain_walls + r.separation_lines:
+        if coord := r.points.get(id_):
+            x, y = coord
+            near: BaseGeometry = box(x - 1, y - 1, x + 1, y + 1)
+        elif (points := r.lines.get(id_)) and len(points) >= 2:
+            near = LineString(points).buffer(1, cap_style=2, join_style=3)
+        else:
+            continue
+
+        if not rel_rooms.get(id_):
+            if rooms := room_index.overlapping(near):
+                rel_rooms[id_] = set(rooms)
+                n_filled += 1
+        else:
+            # cross-check the rooms from revit by location
+            located = set(room_index.candidates(near))
+            n_far += sum(
+                1
+                for room in rel_rooms[id_]
+                if room in room_index.index and room not in located
+            )
+    if n_filled:
+        logger.info("found rooms of %d openings by location", n_filled)
+    if n_far:
+        logger.warning("%d room relations are away from their openings", n_far)
+    return rel_rooms
+
+
+def box_overlap_centers(
+    points: np.ndarray, polygons: Sequence[Sequence[np.ndarray]], half: float = 1
+) -> np.ndarray:
+    """Centers of the overlaps between boxes around points and polygons
+    (shell in [0] and holes in [1:]), pair by pair, nan where they don't
+    overlap. Same as center_of_overlap with the boxes, clipping all at once.
+
+    >>> room = [geometry.open_ring([(0, 0), (10, 0), (10, 10), (0, 10)])]
+    >>> box_overlap_centers(np.array([[10, 5], [20, 5]]), [room, room])
+    array([[9.5, 5. ],
+           [nan, nan]])
+    >>> center_of_overlap(box(9, 4, 11, 6), to_polygon(room))
+    (9.5, 5.0)
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    x, y = points[:, 0], points[:, 1]
+    boxes = np.stack(
+        [
+            np.stack([x - half, y - half], axis=1),
+            np.stack([x + half, y - half], axis=1),
+            np.stack([x + half, y + half], axis=1),
+            np.stack([x - half, y + half], axis=1),
+        ],
+        axis=1,
+    )
+    rings = [ring for polygon in polygons for ring in polygon]
+    counts = np.array([len(polygon) for polygon in polygons], dtype=np.int64)
+    pairs = np.repeat(np.arange(len(polygons)), counts)
+    # holes come after the shell of each polygon
+    is_shell = np.arange(len(rings)) == np.repeat(np.cumsum(counts) - counts, counts)
+    areas, moments = geometry.clipped_pair_moments(
+        rings, boxes, np.arange(len(rings)), pairs
+    )
+    signs = np.where(is_shell, 1.0, -1.0)
+    area = np.bincount(pairs, weights=signs * areas, minlength=len(polygons))
+    moment = np.stack(
+        [
+            np.bincount(pairs, weights=signs * moments[:, k], minlength=len(polygons))
+            for k in range(2)
+        ],
+        axis=1,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            (area > geometry.AREA_TOLERANCE)[:, np.newaxis],
+            moment / area[:, np.newaxis],
+            np.nan,
+        )
+
+
 def direction_from_sides(direction: Direction) -> Tuple[Direction, Direction]:
     if direction in [Direction.UP, Direction.DOWN]:
         return direction, direction  # same all around
@@ -179,17 +371,109 @@ def sided_buffers(
     return left_buffer, right_buffer
 
 
+# a linear glazing with this many pairs of a segment and a related room or
+# more has its segments prefiltered by envelopes and prepared, which only pays
+# off for many segments over a few rooms
+PREFILTER_PAIRS: int = 32
+
+
+class SegmentBuffers:
+    """Sided buffers of the segments of a linear glazing, made once for the
+    overlap tests with every related room.
+
+    Envelopes and prepared buffers are only made when they are first used.
+
+    >>> buffers = SegmentBuffers([(Direction.NORTH, LineString([(0, 0), (0, 10)]))])
+    >>> buffers.directions
+    [(<Direction.EAST: 3>, <Direction.WEST: 7>)]
+    >>> buffers.bounds
+    array([[-1., -1.,  1., 11.]])
+    """
+
+    def __init__(self, segs: Sequence[Tuple[Direction, LineString]], depth: float = 1):
+        self.segs = segs
+        self.depth = depth
+        self.directions: List[Tuple[Direction, Direction]] = [
+            direction_from_sides(direction) for direction, _ in segs
+        ]
+        self.buffers: List[Tuple[Polygon, Polygon]] = [
+            sided_buffers(line, depth) for _, line in segs
+        ]
+
+    def __len__(self) -> int:
+        return len(self.buffers)
+
+    @cached_property
+    def prepared(self) -> List[Tuple[Any, Any]]:
+        return [(prep(left), prep(right)) for left, right in self.buffers]
+
+    @cached_property
+    def bounds(self) -> np.ndarray:
+        """Envelopes of the segments grown by the depth, which hold both of
+        their sides, from the coordinates instead of the buffers."""
+        envelopes = []
+        for _, line in self.segs:
+            coords = np.asarray(line.coords, dtype=float)
+            envelopes.append(
+                [*(coords.min(axis=0) - self.depth), *(coords.max(axis=0) + self.depth)]
+            )
+        return np.array(envelopes, dtype=float).reshape(-1, 4)
+
+    def overlapping_envelopes(self, polygon: Polygon) -> np.ndarray:
+        """Segments with their envelope overlapping that of the polygon."""
+        minx, miny, maxx, maxy = polygon.bounds
+        return np.flatnonzero(
+            (self.bounds[:, 0] <= maxx)
+            & (self.bounds[:, 2] >= minx)
+            & (self.bounds[:, 1] <= maxy)
+            & (self.bounds[:, 3] >= miny)
+        )
+
+
 def facings_from_poly(
-    buffers: Sequence[Tuple[Tuple[Direction, Direction], Tuple[Polygon, Polygon]]],
+    buffers: SegmentBuffers,
     polygon: Polygon,
+    prefilter: bool = False,
 ) -> Set[Direction]:
+    """Facings of a polygon to a linear glazing, from the overlaps with the
+    sided buffers of its segments.
+
+    With prefilter, only the segments with their envelope overlapping the
+    polygon are intersected, through their prepared buffers.
+
+    >>> buffers = SegmentBuffers(to_segmented_lines([(0, 0), (0, 2), (2, 2)]))
+    >>> room = box(-4, -4, 0, 2)
+    >>> facings_from_poly(buffers, room)
+    {<Direction.EAST: 3>}
+    >>> facings_from_poly(buffers, room, prefilter=True)
+    {<Direction.EAST: 3>}
+    """
     facings: Set[Direction] = set()
-    for (direction_from_left, direction_from_right), (
-        left_buffer,
-        right_buffer,
-    ) in buffers:
-        left_area = left_buffer.intersection(polygon).area  # type: ignore
-        right_area = right_buffer.intersection(polygon).area  # type: ignore
+    if prefilter:
+        if polygon.is_empty:
+            return facings
+        # only the segments near the polygon can overlap it
+        slots = buffers.overlapping_envelopes(polygon).tolist()
+    else:
+        slots = range(len(buffers))
+    for i in slots:
+        direction_from_left, direction_from_right = buffers.directions[i]
+        left_buffer, right_buffer = buffers.buffers[i]
+        if prefilter:
+            left_prepared, right_prepared = buffers.prepared[i]
+            left_area = (
+                left_buffer.intersection(polygon).area  # type: ignore
+                if left_prepared.intersects(polygon)
+                else 0
+            )
+            right_area = (
+                right_buffer.intersection(polygon).area  # type: ignore
+                if right_prepared.intersects(polygon)
+                else 0
+            )
+        else:
+            left_area = left_buffer.intersection(polygon).area  # type: ignore
+            right_area = right_buffer.intersection(polygon).area  # type: ignore
         if not left_area and not right_area:  # if there is no overlap
             continue  # ignore
 
@@ -200,19 +484,374 @@ def facings_from_poly(
     return facings
 
 
-def get_model(r: RevitInfo) -> House:
+class SegmentStrips:
+    """Side strips of the segments of a linear glazing, as NumPy rings,
+    the shapely-free counterpart of SegmentBuffers, from to_segmented_coords.
+
+    A strip is a rectangle along one straight edge of a segment, so a bent
+    segment has a strip on each side for each of its edges.
+    All strips are stacked in one array, with their segment and side.
+    """
+
+    def __init__(self, segs: Sequence[Tuple[Direction, np.ndarray]], depth: float = 1):
+        self.directions: List[Tuple[Direction, Direction]] = [
+            direction_from_sides(direction) for direction, _ in segs
+        ]
+        strips: List[np.ndarray] = []
+        segments: List[int] = []
+        sides: List[int] = []
+        for i, (_, coords) in enumerate(segs):
+            for side, side_strips in enumerate(geometry.side_strips(coords, depth)):
+                strips.extend(side_strips)
+                segments.extend([i] * len(side_strips))
+                sides.extend([side] * len(side_strips))
+        self.strips: np.ndarray = np.array(strips, dtype=float).reshape(-1, 4, 2)
+        self.segments: np.ndarray = np.array(segments, dtype=np.int64)
+        # 0 for the left side, 1 for the right side
+        self.sides: np.ndarray = np.array(sides, dtype=np.int64)
+        self.bounds: np.ndarray = np.concatenate(
+            [self.strips.min(axis=1), self.strips.max(axis=1)], axis=1
+        )
+
+    def __len__(self) -> int:
+        return len(self.directions)
+
+    def overlapping_envelopes(self, bounds: np.ndarray) -> np.ndarray:
+        """Strips with their envelope overlapping the bounds."""
+        minx, miny, maxx, maxy = bounds
+        return np.flatnonzero(
+            (self.bounds[:, 0] <= maxx)
+            & (self.bounds[:, 2] >= minx)
+            & (self.bounds[:, 1] <= maxy)
+            & (self.bounds[:, 3] >= miny)
+        )
+
+
+def facings_from_rings(
+    strips: SegmentStrips,
+    rings: Sequence[np.ndarray],
+) -> Set[Direction]:
+    """Facings of a polygon (shell in [0] and holes in [1:]) to a linear
+    glazing, the same as facings_from_poly, by clipping the polygon with the
+    side strips of the segments.
+
+    >>> polyline = [(0, 0), (0, 2), (2, 2)]
+    >>> strips = SegmentStrips(to_segmented_coords(polyline))
+    >>> room = [geometry.open_ring([(-4, -4), (0, -4), (0, 2), (-4, 2)])]
+    >>> facings_from_rings(strips, room)
+    {<Direction.EAST: 3>}
+    >>> facings_from_rings(strips, room) == facings_from_poly(
+    ...     SegmentBuffers(to_segmented_lines(polyline)), to_polygon(room)
+    ... )
+    True
+    """
+    return facings_from_rings_batch([(strips, rings)])[0]
+
+
+def facings_from_rings_batch(
+    pairs: Sequence[Tuple[SegmentStrips, Sequence[np.ndarray]]],
+) -> List[Set[Direction]]:
+    """facings_from_rings of many pairs of a glazing and a room polygon,
+    clipping the polygons with the strips of all pairs at once."""
+    rings: List[np.ndarray] = []
+    convexes: List[np.ndarray] = []
+    # for each ring-strip pair to clip
+    ring_index: List[np.ndarray] = []
+    convex_index: List[np.ndarray] = []
+    signs: List[np.ndarray] = []
+    # for each pair of a strip and a polygon, its side areas to add up to
+    entries: List[np.ndarray] = []
+    side_slots: List[np.ndarray] = []
+    n_entries = n_convexes = n_slots = 0
+    slot_offsets: List[int] = []
+    for strips, polygon in pairs:
+        slot_offsets.append(n_slots)
+        if polygon and len(polygon[0]):
+            # only the strips near the polygon can overlap it
+            near = strips.overlapping_envelopes(geometry.bounds(polygon[0]))
+        else:
+            near = np.zeros(0, dtype=np.int64)
+        convexes.append(strips.strips[near])
+        for k, ring in enumerate(polygon if len(near) else ()):
+            ring_index.append(np.full(len(near), len(rings)))
+            convex_index.append(np.arange(len(near)) + n_convexes)
+            # area of the polygon, without its holes
+            signs.append(np.full(len(near), 1.0 if k == 0 else -1.0))
+            entries.append(np.arange(len(near)) + n_entries)
+            rings.append(ring)
+        side_slots.append(n_slots + strips.segments[near] * 2 + strips.sides[near])
+        n_entries += len(near)
+        n_convexes += len(near)
+        n_slots += len(strips) * 2
+
+    areas = np.zeros(n_entries)
+    if rings:
+        np.add.at(
+            areas,
+            np.concatenate(entries),
+            np.concatenate(signs)
+            * geometry.clipped_pair_areas(
+                rings,
+                np.concatenate(convexes),
+                np.concatenate(ring_index),
+                np.concatenate(convex_index),
+            ),
+        )
+    areas[areas <= geometry.AREA_TOLERANCE] = 0
+    side_areas = np.zeros(n_slots)
+    np.add.at(
+        side_areas, np.concatenate(side_slots + [np.zeros(0, dtype=np.int64)]), areas
+    )
+
+    results: List[Set[Direction]] = []
+    for (strips, _), offset in zip(pairs, slot_offsets):
+        facings: Set[Direction] = set()
+        sides = side_areas[offset : offset + len(strips) * 2].reshape(-1, 2)
+        for (direction_from_left, direction_from_right), (
+            left_area,
+            right_area,
+        ) in zip(strips.directions, sides):
+            if not left_area and not right_area:  # if there is no overlap
+                continue  # ignore
+
+            if left_area >= right_area:  # if room is on left side
+                facings.add(direction_from_left)
+            else:
+                facings.add(direction_from_right)
+        results.append(facings)
+    return results
+
+
+def sorted_facings(facings: Set[Direction]) -> Tuple[Direction, ...]:
+    """Facings in the order of directions, the same in every process."""
+    return tuple(sorted(facings, key=lambda direction: direction.value))
+
+
+# a point glazing or a linear glazing, with its raw coordinates and rooms
+PointGlazing = Tuple[int, Tuple[float, float], Sequence[int]]
+LinearGlazing = Tuple[int, Sequence[Tuple[float, float]], Sequence[int]]
+
+
+def relations_of_glazings(
+    point_glazings: Sequence[PointGlazing],
+    linear_glazings: Sequence[LinearGlazing],
+    boundaries: Mapping[int, Sequence[Sequence[Tuple[float, float]]]],
+    true_north: float = 0,
+    analytic: bool = False,
+) -> List[RoomGlazingRelation]:
+    """Room-glazing relations of the glazings, from raw coordinates only,
+    so that any chunk of glazings can be sent to another process.
+
+    Point objects are always related by box_overlap_centers;
+    with analytic, no shapely geometry is made at all.
+    """
+
+    room_glazing_relations: List[RoomGlazingRelation] = []
+    # the rings as NumPy arrays, for the point objects on either path
+    room_rings = {
+        room: [geometry.open_ring(ring) for ring in rings]
+        for room, rings in boundaries.items()
+    }
+    # no shapely geometry at all on the analytic path
+    room_polygons: Dict[int, Polygon] = (
+        {}
+        if analytic
+        else {room: to_polygon(rings) for room, rings in boundaries.items()}
+    )
+    # for point objects, overlaps of every pair are computed together
+    point_rels: List[Tuple[int, int]] = []
+    coords: List[Tuple[float, float]] = []
+    for glazing_id, coord, glazing_rooms in point_glazings:
+        for room in glazing_rooms:
+            if room in room_rings:
+                point_rels.append((room, glazing_id))
+                coords.append(coord)
+    centers = box_overlap_centers(
+        np.array(coords), [room_rings[room] for room, _ in point_rels]
+    )
+    overlapping = ~np.isnan(centers[:, 0])
+    point_rels = [rel for rel, o in zip(point_rels, overlapping) if o]
+    overlaps = centers[overlapping]
+    coords = [coord for coord, o in zip(coords, overlapping) if o]
+    # bearings from rooms (overlaps) to glazings, into 8-direction
+    codes = direction_codes(np.array(overlaps), np.array(coords), true_north)
+    room_glazing_relations.extend(
+        RoomGlazingRelation(
+            room_id=room, glazing_id=glazing_id, facings=(DIRECTION_TABLE[code],)
+        )
+        for (room, glazing_id), code in zip(point_rels, codes)
+    )
+    # for linear objects
+    linear_rels: List[Tuple[int, int]] = []
+    linear_pairs: List[Tuple[SegmentStrips, List[np.ndarray]]] = []
+    for glazing_id, points, glazing_rooms in linear_glazings:
+        if analytic:
+            # facings of every pair are computed together, after the loop
+            seg_coords = to_segmented_coords(points, true_north=true_north)
+            if not seg_coords:
+                continue
+            strips = SegmentStrips(seg_coords)
+            for room in glazing_rooms:
+                if room in room_rings:
+                    linear_rels.append((room, glazing_id))
+                    linear_pairs.append((strips, room_rings[room]))
+            continue
+
+        segs = to_segmented_lines(points, true_north=true_north)
+
+        if not segs:
+            continue
+
+        buffers = SegmentBuffers(segs)
+        prefilter = (
+            len(glazing_rooms) >= 2
+            and len(glazing_rooms) * len(segs) >= PREFILTER_PAIRS
+        )
+
+        for room in glazing_rooms:
+            room_poly = room_polygons.get(room)
+
+            if room_poly is None:
+                continue
+
+            if facings := facings_from_poly(buffers, room_poly, prefilter):
+                room_glazing_relations.append(
+                    RoomGlazingRelation(
+                        room_id=room,
+                        glazing_id=glazing_id,
+                        facings=sorted_facings(facings),
+                    )
+                )
+    room_glazing_relations.extend(
+        RoomGlazingRelation(
+            room_id=room, glazing_id=glazing_id, facings=sorted_facings(facings)
+        )
+        for (room, glazing_id), facings in zip(
+            linear_rels, facings_from_rings_batch(linear_pairs)
+        )
+        if facings
+    )
+    return room_glazing_relations
+
+
+def parallel_relations_of_glazings(
+    point_glazings: Sequence[PointGlazing],
+    linear_glazings: Sequence[LinearGlazing],
+    boundaries: Mapping[int, Sequence[Sequence[Tuple[float, float]]]],
+    true_north: float = 0,
+    analytic: bool = False,
+    workers: int = 2,
+) -> List[RoomGlazingRelation]:
+    """relations_of_glazings over a process pool, with the same result.
+
+    Glazings are split into contiguous chunks, each sent with the boundaries
+    of its own rooms, and the relations of the chunks are joined in order.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    def chunks(glazings: Sequence[Any]) -> List[Sequence[Any]]:
+        size = max(1, -(-len(glazings) // (workers * 4)))
+        return [glazings[i : i + size] for i in range(0, len(glazings), size)]
+
+    jobs = [(chunk, []) for chunk in chunks(point_glazings)] + [
+        ([], chunk) for chunk in chunks(linear_glazings)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            relations_of_glazings,
+            [points for points, _ in jobs],
+            [lines for _, lines in jobs],
+            [
+                {
+                    room: boundaries[room]
+                    for _, _, rooms in points + lines
+                    for room in rooms
+                    if room in boundaries
+                }
+                for points, lines in jobs
+            ],
+            [true_north] * len(jobs),
+            [analytic] * len(jobs),
+        )
+        return [rel for relations in results for rel in relations]
+
+
+# square feet to square meters
+SQUARE_METERS_PER_SQUARE_FOOT = 0.3048 ** 2
+
+
+def room_size_fields(metrics: geometry.ShapeMetrics) -> List[Dict[str, Any]]:
+    """Optional fields of Room from metrics of their polygons in feet.
+
+    >>> metrics = geometry.polygon_metrics(
+    ...     np.array([(0, 0), (10, 0), (10, 5), (0, 5)]), [0, 4], [0, 1]
+    ... )
+    >>> room_size_fields(metrics)  # doctest: +NORMALIZE_WHITESPACE
+    [{'area': 4.6452, 'perimeter': Length(mm=9144.0), 'centroid': (5.0, 2.5),
+      'compactness': 0.6981, 'aspect_ratio': 2.0}]
+    """
+    fields = []
+    for area, perimeter, centroid, compactness, aspect_ratio in zip(
+        metrics.area.tolist(),
+        metrics.perimeter.tolist(),
+        metrics.centroid.tolist(),
+        metrics.compactness.tolist(),
+        metrics.aspect_ratio.tolist(),
+    ):
+        if not area > geometry.AREA_TOLERANCE:
+            fields.append({})
+            continue
+        fields.append(
+            dict(
+                area=round(area * SQUARE_METERS_PER_SQUARE_FOOT, 4),
+                perimeter=Length.from_ft(perimeter),
+                centroid=(centroid[0], centroid[1]),
+                compactness=round(compactness, 4),
+                aspect_ratio=round(aspect_ratio, 4),
+            )
+        )
+    return fields
+
+
+def get_model(
+    r: RevitInfo,
+    analytic: bool = False,
+    workers: int = 1,
+    keep_geometry: bool = False,
+    locate: bool = False,
+) -> House:
+    """Build a house model from the elements and shapes of a Revit model.
+
+    Boxes around point glazings are clipped by the rooms with NumPy, all at
+    once, by box_overlap_centers.
+    With analytic, strips along linear glazings are clipped the same way,
+    by facings_from_rings_batch, instead of intersecting shapely geometries.
+
+    With more than one worker, room-glazing relations of chunks of glazings
+    are computed in that many processes, with the same result.
+
+    With keep_geometry, the house keeps the shapes of its rooms and glazings.
+
+    With locate, openings that Revit couldn't relate to any room get the
+    rooms around them, by located_rel_rooms.
+    """
+
     def _count_value(from_: Mapping[Any, Collection[Any]], key: Any) -> int:
         val = from_.get(key)
         return len(val) if val else 0
 
     def count_rooms(key: Any) -> int:
-        return _count_value(r.rel_rooms, key)
+        return _count_value(rel_rooms, key)
 
     print("building the very model of a modern, major housing 🏗")
-    rooms: Set[Room] = set(
-        Room(element_id=id_, name=r.names[id_], height=Length.from_ft(r.heights[id_]))
-        for id_ in r.rooms
-    )
+    boundaries = {room: b for room in r.rooms if (b := r.boundaries.get(room))}
+    if locate:
+        # rooms are found by location for openings revit couldn't relate
+        rel_rooms = located_rel_rooms(
+            r, RoomIndex({room: to_polygon(b) for room, b in boundaries.items()})
+        )
+    else:
+        rel_rooms = r.rel_rooms
 
     room_conns: Set[RoomConnection] = set()
     for id_list, object_type in [
@@ -221,7 +860,7 @@ def get_model(r: RevitInfo) -> House:
     ]:
         for glazing_id in id_list:
             if count_rooms(glazing_id) >= 2:
-                for pair in combinations(r.rel_rooms[glazing_id], 2):
+                for pair in combinations(rel_rooms[glazing_id], 2):
                     room_conns.add(RoomConnection(*sorted(pair), type_=object_type))
 
     glazings: set[Glazing] = set()
@@ -261,73 +900,275 @@ def get_model(r: RevitInfo) -> House:
         if count_rooms(id_) >= 1  # sanity check: a glazing should have a room.
     )
 
-    room_polygons = {
-        room: to_polygon(b) for room in r.rooms if (b := r.boundaries.get(room))
-    }
-    room_glazing_relations: List[RoomGlazingRelation] = []
-    # for point objects
-    for glazing_id in transparent_doors + r.windows:
-        rel_rooms = r.rel_rooms.get(glazing_id)
-        coord = r.points.get(glazing_id)
+    # sizes and shapes of every room at once, from their boundaries,
+    # made once with the shapes of the glazings if the house keeps them
+    kept = {glazing.element_id for glazing in glazings} if keep_geometry else set()
+    house_geometry = HouseGeometry.from_shapes(
+        boundaries,
+        {id_: xy for id_, xy in r.points.items() if id_ in kept},
+        {id_: xy for id_, xy in r.lines.items() if id_ in kept},
+    )
+    room_sizes = dict(
+        zip(
+            house_geometry.room_ids.tolist(),
+            room_size_fields(house_geometry.room_metrics()),
+        )
+    )
+    rooms: Set[Room] = set(
+        Room(
+            element_id=id_,
+            name=r.names[id_],
+            height=Length.from_ft(r.heights[id_]),
+            **room_sizes.get(id_, {}),
+        )
+        for id_ in r.rooms
+    )
 
-        if not rel_rooms or not coord:
-            continue
+    # glazings with their raw geometry and rooms, in the order of relations
+    point_glazings = [
+        (glazing_id, coord, list(glazing_rooms))
+        for glazing_id in transparent_doors + r.windows
+        if (glazing_rooms := rel_rooms.get(glazing_id))
+        and (coord := r.points.get(glazing_id))
+    ]
+    linear_glazings = [
+        (glazing_id, points, list(glazing_rooms))
+        for glazing_id in r.curtain_walls + r.separation_lines
+        if (glazing_rooms := rel_rooms.get(glazing_id))
+        and (points := r.lines.get(glazing_id))
+    ]
+    if workers > 1:
+        room_glazing_relations = parallel_relations_of_glazings(
+            point_glazings, linear_glazings, boundaries, r.true_north, analytic, workers
+        )
+    else:
+        room_glazing_relations = relations_of_glazings(
+            point_glazings, linear_glazings, boundaries, r.true_north, analytic
+        )
+    return House(
+        rooms=tuple(rooms),
+        room_connections=tuple(room_conns),
+        glazings=tuple(glazings),
+        room_glazing_relations=tuple(room_glazing_relations),
+        geometry=house_geometry if keep_geometry else None,
+    )
 
-        x, y = coord
-        g_box: Polygon = box(x - 1, y - 1, x + 1, y + 1)
 
-        for room in rel_rooms:
-            room_poly = room_polygons.get(room)
-            if room_poly is None:
-                continue
+def unit_rooms(
+    r: RevitInfo,
+    rel_rooms: Mapping[int, Collection[int]],
+    room_index: RoomIndex,
+    common_rooms: Collection[int] = (),
+    gap: float = 1,
+) -> List[List[int]]:
+    """Rooms of each dwelling unit of a building, without the common rooms.
 
-            c_overlap = center_of_overlap(g_box, room_poly)
-            if c_overlap is None:
-                continue
+    Rooms joined by a door, a window or a separation line are in the same
+    unit, unless one of them is a common room (a corridor or a stair shared
+    by the units). Rooms with no door nor separation line at all, like a
+    balcony behind a window, join the unit of the nearest room within gap.
+    Units are in the order of their first rooms.
 
-            # calculate bearing from room (overlap) to glazing
-            bearing = (
-                azimuth(c_overlap, coord) - r.true_north  # make the true north == 0
-            )
-            # into 8-direction
-            direction = to_direction(bearing)
+    >>> polygons = {i: box(10 * i, 0, 10 * i + 10, 10) for i in range(4)}
+    >>> polygons[5] = box(0, 10, 40, 14)  # corridor
+    >>> polygons[6] = box(32, -5, 40, 0)  # balcony
+    >>> r = RevitInfo(rooms=[0, 1, 2, 3, 5, 6], doors=[10, 11, 12, 13])
+    >>> rel_rooms = {10: {0, 1}, 11: {2, 3}, 12: {1, 5}, 13: {3, 5}}
+    >>> unit_rooms(r, rel_rooms, RoomIndex(polygons), common_rooms=[5])
+    [[0, 1], [2, 3, 6]]
+    """
+    common_rooms = set(common_rooms)
+    sets = UnionFind(room for room in r.rooms if room not in common_rooms)
+    accessed: Set[int] = set()
+    for id_ in r.doors + r.windows + r.separation_lines:
+        rooms = [room for room in rel_rooms.get(id_, ()) if room in sets.parents]
+        for a, b in zip(rooms, rooms[1:]):
+            sets.union(a, b)
+        if id_ not in r.windows:
+            accessed.update(rooms)
 
-            room_glazing_relations.append(
-                RoomGlazingRelation(
-                    room_id=room, glazing_id=glazing_id, facings=(direction,)
+    # a group with no access at all is only a part of the unit next to it
+    accessible = {sets.find(room) for room in accessed}
+    for group in sets.groups():
+        if sets.find(next(iter(group))) in accessible:
+            continue
+        near: List[Tuple[float, int]] = []
+        for member in group & set(room_index.index):
+            polygon = room_index.polygons[room_index.index[member]]
+            near.extend(
+                (distance, room)
+                for room in room_index.candidates(polygon.buffer(gap))
+                if room in sets.parents
+                and sets.find(room) in accessible
+                and (
+                    distance := polygon.distance(
+                        room_index.polygons[room_index.index[room]]
+                    )
                 )
+                <= gap
             )
-    # for linear objects
-    for glazing_id in r.curtain_walls + r.separation_lines:
-        rel_rooms = r.rel_rooms.get(glazing_id)
-        points = r.lines.get(glazing_id)
-        segs = to_segmented_lines(points, true_north=r.true_north) if points else None
+        if near:
+            sets.union(min(near)[1], next(iter(group)))
 
-        if not rel_rooms or not segs:
+    units: Dict[int, List[int]] = {}
+    for room in sets.parents:
+        units.setdefault(sets.find(room), []).append(room)
+    return list(units.values())
+
+
+def shared_rooms(
+    r: RevitInfo,
+    rel_rooms: Mapping[int, Collection[int]],
+    room_index: RoomIndex,
+    candidates: Collection[int],
+) -> List[int]:
+    """Candidates for common rooms that are shared by the units.
+
+    A candidate opening (by a door or a separation line) to the rooms of
+    only one unit, and to no other candidate, belongs to that unit, like
+    the stair of a duplex. Any other candidate is common.
+
+    >>> polygons = {i: box(10 * i, 0, 10 * i + 10, 10) for i in range(5)}
+    >>> polygons[5] = box(0, 10, 50, 14)  # corridor
+    >>> polygons[6] = box(0, 14, 10, 20)  # stair of the building
+    >>> r = RevitInfo(rooms=list(range(7)), doors=[10, 11, 12, 13, 14, 15])
+    >>> rel_rooms = {10: {0, 1}, 11: {1, 2}, 12: {3, 4}}  # 2 is a duplex stair
+    >>> rel_rooms.update({13: {0, 5}, 14: {3, 5}, 15: {5, 6}})
+    >>> shared_rooms(r, rel_rooms, RoomIndex(polygons), candidates=[2, 5, 6])
+    [5, 6]
+    """
+    candidates = set(candidates)
+    units = unit_rooms(r, rel_rooms, room_index, candidates)
+    unit_of = {room: i for i, rooms in enumerate(units) for room in rooms}
+    neighbors: Dict[int, Set[int]] = {room: set() for room in candidates}
+    for id_ in r.doors + r.separation_lines:
+        rooms = set(rel_rooms.get(id_, ()))
+        for room in rooms & candidates:
+            neighbors[room].update(rooms - {room})
+
+    shared: List[int] = []
+    for room in r.rooms:
+        if room not in candidates:
             continue
+        near_units = {unit_of[n] for n in neighbors[room] if n in unit_of}
+        if len(near_units) == 1 and not neighbors[room] & candidates:
+            continue  # a part of its only unit
+        shared.append(room)
+    return shared
 
-        buffers = [
-            (direction_from_sides(seg[0]), sided_buffers(seg[1])) for seg in segs
-        ]
 
-        for room in rel_rooms:
-            room_poly = room_polygons.get(room)
+def split_units(
+    r: RevitInfo, common_rooms: Optional[Collection[int]] = None
+) -> List[RevitInfo]:
+    """Revit infos of each dwelling unit of a building, by unit_rooms.
 
-            if room_poly is None:
-                continue
+    Common rooms are found by their names (is_common) and the units around
+    them (shared_rooms) unless given.
+    Each unit has its rooms and the openings related to them, with the
+    related rooms of the openings only in the unit, so an entrance door
+    from a corridor leads to the outside of the unit.
 
-            if facings := facings_from_poly(buffers, room_poly):
-                room_glazing_relations.append(
-                    RoomGlazingRelation(
-                        room_id=room, glazing_id=glazing_id, facings=tuple(facings)
-                    )
+    A duplex keeps its own stair, while the stair of the building is common.
+
+    >>> names = ["거실", "침실", "계단", "거실", "침실", "공용복도", "계단실"]
+    >>> shapes = [box(10 * i, 0, 10 * i + 10, 10) for i in range(5)]
+    >>> shapes += [box(0, 10, 50, 14), box(0, 14, 10, 20)]
+    >>> r = RevitInfo(rooms=list(range(7)), doors=[10, 11, 12, 13, 14, 15])
+    >>> r.names = dict(enumerate(names))
+    >>> r.heights = {i: 8.0 for i in r.rooms}
+    >>> r.boundaries = {i: [list(p.exterior.coords)] for i, p in enumerate(shapes)}
+    >>> r.rel_rooms = {10: {0, 1}, 11: {1, 2}, 12: {3, 4}}
+    >>> r.rel_rooms.update({13: {0, 5}, 14: {3, 5}, 15: {5, 6}})
+    >>> [unit.rooms for unit in split_units(r)]
+    [[0, 1, 2], [3, 4]]
+    """
+    room_polygons = {
+        room: to_polygon(b) for room in r.rooms if (b := r.boundaries.get(room))
+    }
+    room_index = RoomIndex(room_polygons)
+    rel_rooms = located_rel_rooms(r, room_index)
+    if common_rooms is None:
+        candidates = [
+            id_
+            for id_ in r.rooms
+            if is_common(
+                Room(
+                    element_id=id_,
+                    name=r.names[id_],
+                    height=Length.from_ft(r.heights[id_]),
                 )
-    return House(
-        rooms=tuple(rooms),
-        room_connections=tuple(room_conns),
-        glazings=tuple(glazings),
-        room_glazing_relations=tuple(room_glazing_relations),
-    )
+            )
+        ]
+        common_rooms = shared_rooms(r, rel_rooms, room_index, candidates)
+
+    units: List[RevitInfo] = []
+    for i, rooms in enumerate(unit_rooms(r, rel_rooms, room_index, common_rooms)):
+        in_unit = set(rooms)
+        unit_rel_rooms = {
+            id_: related & in_unit
+            for id_, related in rel_rooms.items()
+            if related & in_unit
+        }
+
+        def openings(ids: List[int]) -> List[int]:
+            return [id_ for id_ in ids if id_ in unit_rel_rooms]
+
+        unit = RevitInfo(
+            doc_name=f"{r.doc_name} #{i + 1}" if r.doc_name else None,
+            true_north=r.true_north,
+            phase=r.phase,
+            rooms=rooms,
+            doors=openings(r.doors),
+            windows=openings(r.windows),
+            curtain_walls=openings(r.curtain_walls),
+            separation_lines=openings(r.separation_lines),
+            rel_rooms=unit_rel_rooms,
+        )
+        elements = set(unit.rooms + unit.doors) | set(unit_rel_rooms)
+        for field_ in (
+            "names",
+            "heights",
+            "transparencies",
+            "boundary_segments",
+            "points",
+            "lines",
+            "boundaries",
+        ):
+            values = getattr(r, field_)
+            setattr(unit, field_, {k: v for k, v in values.items() if k in elements})
+        units.append(unit)
+    return units
+
+
+def get_unit_models(
+    r: RevitInfo,
+    common_rooms: Optional[Collection[int]] = None,
+    analytic: bool = False,
+    workers: int = 1,
+    keep_geometry: bool = False,
+) -> List[House]:
+    """House models of each dwelling unit of a building, by split_units.
+
+    With more than one worker, the units are built in that many processes.
+    """
+    units = split_units(r, common_rooms)
+    if workers <= 1:
+        return [
+            get_model(unit, analytic, keep_geometry=keep_geometry) for unit in units
+        ]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                get_model,
+                units,
+                [analytic] * len(units),
+                [1] * len(units),
+                [keep_geometry] * len(units),
+            )
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,771 @@
+"""A stand-in for the Revit API, to run revitapi.get_revit_info without Revit.
+
+Only the part of `Autodesk.Revit.DB` that revitapi uses is here, and it is
+filled from a RevitInfo (a saved snapshot or a synthetic one). Each call of
+a method or a property of a Revit object crosses the bridge, which counts
+the calls and can wait for a given latency, as pythonnet takes its time to
+marshal every call between Python and .NET.
+
+>>> r = RevitInfo(
+...     doc_name="sample.rvt",
+...     true_north=0.5,
+...     rooms=[1, 2],
+...     doors=[10],
+...     separation_lines=[20],
+...     names={1: "거실", 2: "주방"},
+...     heights={1: 9.0, 2: 9.0},
+...     transparencies={10: 0},
+...     rel_rooms={10: {1, 2}, 20: {1, 2}},
+...     points={10: (10.0, 2.0)},
+...     lines={20: [(10.0, 5.0), (10.0, 10.0)]},
+...     boundaries={
+...         1: [[(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0)]],
+...         2: [[(10.0, 0.0), (20.0, 0.0), (20.0, 10.0), (10.0, 10.0)]],
+...     },
+... )
+>>> with installed() as bridge:  # doctest: +ELLIPSIS
+...     extracted = revitapi.get_revit_info(fake_revit(r))
+preparing...
+get elements...
+...
+done with revit 👋
+>>> extracted.rooms, extracted.rel_rooms
+([1, 2], {10: {1, 2}, 20: {1, 2}})
+>>> extracted.boundaries[1][0]
+[(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)]
+>>> bridge.calls["Room.GetBoundarySegments"]
+4
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+import itertools
+import math
+import sys
+import time
+import types
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from . import revitapi
+from .model import RevitInfo
+
+
+class Bridge:
+    """Counts the calls to Revit objects, and makes each take the latency
+    (in seconds), waiting in a busy loop to be precise in microseconds."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+
+    def cross(self, name: str) -> None:
+        self.calls[name] += 1
+        if self.latency > 0:
+            end = time.perf_counter() + self.latency
+            while time.perf_counter() < end:
+                pass
+
+
+bridge = Bridge()
+
+
+class _NetProperty:
+    """A property of a Revit object, which crosses the bridge to be read."""
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        bridge.cross(f"{type(obj).__name__}.{self.name}")
+        return obj.__dict__["_" + self.name]
+
+
+def _net_method(name: str, owner: Any) -> None:
+    bridge.cross(f"{type(owner).__name__}.{name}")
+
+
+### values and enums, as ints like pythonnet gives them
+
+
+class BuiltInCategory:
+    OST_Rooms = -2000160
+    OST_Doors = -2000023
+    OST_Windows = -2000014
+    OST_Walls = -2000011
+    OST_RoomSeparationLines = -2000066
+    OST_Views = -2000279
+
+
+class BuiltInParameter:
+    VIEW_PHASE = -1012101
+
+
+class StorageType:
+    Integer = 1
+    Double = 2
+    String = 3
+    ElementId = 4
+
+
+class ElementOnPhaseStatus:
+    Past = 1
+    Existing = 2
+    Demolished = 3
+    New = 4
+    Temporary = 5
+    Future = 6
+
+
+# None is a keyword in python
+setattr(ElementOnPhaseStatus, "None", 0)
+
+
+class WallKind:
+    Unknown = -1
+    Basic = 0
+    Curtain = 1
+    Stacked = 2
+
+
+class SpatialElementBoundaryLocation:
+    Finish = 0
+    Center = 1
+    CoreBoundary = 2
+    CoreCenter = 3
+
+
+class SpatialElementBoundaryOptions:
+    def __init__(self):
+        self.SpatialElementBoundaryLocation = SpatialElementBoundaryLocation.Finish
+        self.StoreFreeBoundaryFaces = False
+
+
+class ElementId:
+    def __init__(self, value: int):
+        self._IntegerValue = int(value)
+
+    IntegerValue = _NetProperty()
+
+    def get_IntegerValue(self) -> int:
+        _net_method("get_IntegerValue", self)
+        return self._IntegerValue
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, ElementId) and other._IntegerValue == self._IntegerValue
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._IntegerValue)
+
+
+class XYZ:
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self._X, self._Y, self._Z = x, y, z
+
+    X = _NetProperty()
+    Y = _NetProperty()
+    Z = _NetProperty()
+
+
+XYZ.Zero = XYZ()  # type: ignore
+
+
+### curves
+
+
+class Curve:
+    def __init__(self, points: Sequence[Tuple[float, float]]):
+        self.points = [tuple(map(float, point)) for point in points]
+        self._IsBound = True
+
+    IsBound = _NetProperty()
+
+    def GetEndParameter(self, index: int) -> float:
+        _net_method("GetEndParameter", self)
+        return [0.0, float(len(self.points) - 1)][index]
+
+    def GetEndPoint(self, index: int) -> XYZ:
+        _net_method("GetEndPoint", self)
+        return XYZ(*self.points[[0, -1][index]])
+
+    def Evaluate(self, parameter: float, normalized: bool) -> XYZ:
+        """Point along the polyline, a vertex at each integer parameter."""
+        _net_method("Evaluate", self)
+        end = len(self.points) - 1
+        if normalized:
+            parameter *= end
+        i = min(max(int(math.floor(parameter)), 0), max(end - 1, 0))
+        t = parameter - i
+        (x0, y0), (x1, y1) = self.points[i], self.points[min(i + 1, end)]
+        return XYZ(x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+
+
+class Line(Curve):
+    pass
+
+
+class Arc(Curve):
+    pass
+
+
+class Ellipse(Curve):
+    pass
+
+
+def _curve(points: Sequence[Tuple[float, float]]) -> Curve:
+    # a polyline isn't a curve in Revit, so it is evaluated as a curve would be
+    return Line(points) if len(points) == 2 else Curve(points)
+
+
+class LocationPoint:
+    def __init__(self, point: Tuple[float, float]):
+        self._Point = XYZ(*point)
+
+    Point = _NetProperty()
+
+
+class LocationCurve:
+    def __init__(self, points: Sequence[Tuple[float, float]]):
+        self._Curve = _curve(points)
+
+    Curve = _NetProperty()
+
+
+class BoundarySegment:
+    def __init__(self, element_id: int, start, end):
+        self._ElementId = ElementId(element_id)
+        self.curve = Line([start, end])
+
+    ElementId = _NetProperty()
+
+    def GetCurve(self) -> Curve:
+        _net_method("GetCurve", self)
+        return self.curve
+
+
+### elements
+
+
+class Category:
+    def __init__(self, category: int, name: str):
+        self._Id = ElementId(category)
+        self._Name = name
+
+    Id = _NetProperty()
+    Name = _NetProperty()
+
+    @staticmethod
+    def GetCategory(doc: "Document", category: int) -> "Category":
+        bridge.cross("Category.GetCategory")
+        return doc.categories[category]
+
+
+class Parameter:
+    def __init__(self, value: Any):
+        self.value = value
+        self._StorageType = (
+            StorageType.ElementId
+            if isinstance(value, ElementId)
+            else (
+                StorageType.Integer
+                if isinstance(value, int)
+                else (
+                    StorageType.Double
+                    if isinstance(value, float)
+                    else StorageType.String
+                )
+            )
+        )
+
+    StorageType = _NetProperty()
+
+    def AsInteger(self) -> int:
+        _net_method("AsInteger", self)
+        return self.value
+
+    def AsDouble(self) -> float:
+        _net_method("AsDouble", self)
+        return self.value
+
+    def AsString(self) -> str:
+        _net_method("AsString", self)
+        return self.value
+
+    def AsElementId(self) -> ElementId:
+        _net_method("AsElementId", self)
+        return self.value
+
+
+class Element:
+    def __init__(
+        self,
+        id_: int,
+        name: str = "",
+        category: Optional[Category] = None,
+        location: Any = None,
+        parameters: Optional[Dict[int, Any]] = None,
+    ):
+        self._Id = ElementId(id_)
+        self._Name = name
+        self._Category = category
+        self._Location = location
+        self.parameters = {
+            key: Parameter(value) for key, value in (parameters or {}).items()
+        }
+
+    Id = _NetProperty()
+    Name = _NetProperty()
+    Category = _NetProperty()
+    Location = _NetProperty()
+
+    def get_Name(self) -> str:
+        _net_method("get_Name", self)
+        return self._Name
+
+    def get_Parameter(self, parameter: int) -> Parameter:
+        _net_method("get_Parameter", self)
+        return self.parameters[parameter]
+
+    def GetPhaseStatus(self, phase: ElementId) -> int:
+        _net_method("GetPhaseStatus", self)
+        return ElementOnPhaseStatus.New
+
+
+class Phase(Element):
+    pass
+
+
+class View(Element):
+    pass
+
+
+class Material(Element):
+    def __init__(self, id_: int, transparency: int):
+        super().__init__(id_, name="glass" if transparency else "opaque")
+        self._Transparency = transparency
+
+    Transparency = _NetProperty()
+
+
+class FamilySymbol(Element):
+    def __init__(self, id_: int, materials: Dict[ElementId, float]):
+        super().__init__(id_)
+        self.materials = materials
+
+    def GetMaterialIds(self, paint: bool) -> List[ElementId]:
+        _net_method("GetMaterialIds", self)
+        return [] if paint else list(self.materials)
+
+
+class FamilyInstance(Element):
+    def __init__(
+        self,
+        id_: int,
+        category: Category,
+        location: Optional[LocationPoint],
+        symbol: FamilySymbol,
+        from_room: Optional["Room"],
+        to_room: Optional["Room"],
+    ):
+        super().__init__(id_, category=category, location=location)
+        self._Symbol = symbol
+        self._FromRoom, self._ToRoom = from_room, to_room
+
+    Symbol = _NetProperty()
+    FromRoom = _NetProperty()
+    ToRoom = _NetProperty()
+
+    def get_FromRoom(self, phase: Phase) -> Optional["Room"]:
+        _net_method("get_FromRoom", self)
+        return self._FromRoom
+
+    def get_ToRoom(self, phase: Phase) -> Optional["Room"]:
+        _net_method("get_ToRoom", self)
+        return self._ToRoom
+
+    def GetMaterialArea(self, material: ElementId, paint: bool) -> float:
+        _net_method("GetMaterialArea", self)
+        return self._Symbol.materials.get(material, 0.0)
+
+
+class WallType(Element):
+    def __init__(self, id_: int, kind: int):
+        super().__init__(id_)
+        self._Kind = kind
+
+    Kind = _NetProperty()
+
+
+class Wall(Element):
+    def __init__(
+        self,
+        id_: int,
+        category: Category,
+        location: Optional[LocationCurve],
+        wall_type: WallType,
+    ):
+        super().__init__(id_, category=category, location=location)
+        self._WallType = wall_type
+
+    WallType = _NetProperty()
+
+
+class ModelCurve(Element):
+    pass
+
+
+class SpatialElement(Element):
+    def __init__(
+        self,
+        id_: int,
+        name: str,
+        category: Category,
+        location: Optional[LocationPoint],
+        area: float,
+        height: float,
+        segments: List[List[BoundarySegment]],
+    ):
+        super().__init__(id_, name, category, location)
+        self._Area = area
+        self._UnboundedHeight = height
+        self.segments = segments
+
+    Area = _NetProperty()
+    UnboundedHeight = _NetProperty()
+
+    def GetBoundarySegments(
+        self, options: SpatialElementBoundaryOptions
+    ) -> List[List[BoundarySegment]]:
+        _net_method("GetBoundarySegments", self)
+        return self.segments
+
+
+class Room(SpatialElement):
+    pass
+
+
+Architecture = types.SimpleNamespace(Room=Room)
+
+
+### document
+
+
+class FilteredElementCollector:
+    def __init__(self, doc: "Document"):
+        bridge.cross("FilteredElementCollector")
+        self.elements: Iterable[Element] = doc.elements.values()
+
+    def OfCategory(self, category: int) -> "FilteredElementCollector":
+        bridge.cross("FilteredElementCollector.OfCategory")
+        self.elements = [
+            elem
+            for elem in self.elements
+            if elem._Category is not None
+            and elem._Category._Id._IntegerValue == category
+        ]
+        return self
+
+    def OfClass(self, type_: type) -> "FilteredElementCollector":
+        bridge.cross("FilteredElementCollector.OfClass")
+        self.elements = [elem for elem in self.elements if isinstance(elem, type_)]
+        return self
+
+    def WhereElementIsNotElementType(self) -> "FilteredElementCollector":
+        bridge.cross("FilteredElementCollector.WhereElementIsNotElementType")
+        return self
+
+    def __iter__(self) -> Iterator[Element]:
+        for elem in self.elements:
+            bridge.cross("FilteredElementCollector.MoveNext")
+            yield elem
+
+
+class ProjectPosition:
+    def __init__(self, angle: float):
+        self._Angle = angle
+
+    Angle = _NetProperty()
+
+
+class ProjectLocation:
+    def __init__(self, angle: float):
+        self.angle = angle
+
+    def GetProjectPosition(self, point: XYZ) -> ProjectPosition:
+        _net_method("GetProjectPosition", self)
+        return ProjectPosition(self.angle)
+
+
+class Document:
+    def __init__(self, path_name: str, true_north: float):
+        self._PathName = path_name
+        self._ActiveProjectLocation = ProjectLocation(true_north)
+        self.elements: Dict[int, Element] = {}
+        self.categories: Dict[int, Category] = {
+            category: Category(category, name[len("OST_") :])
+            for name, category in vars(BuiltInCategory).items()
+            if name.startswith("OST_")
+        }
+        self._Phases: List[Phase] = []
+
+    PathName = _NetProperty()
+    ActiveProjectLocation = _NetProperty()
+    Phases = _NetProperty()
+
+    def GetElement(self, id_: ElementId) -> Optional[Element]:
+        _net_method("GetElement", self)
+        return self.elements.get(id_._IntegerValue)
+
+    def add(self, elem: Element) -> Element:
+        self.elements[elem._Id._IntegerValue] = elem
+        return elem
+
+
+class UIDocument:
+    def __init__(self, doc: Document):
+        self._Document = doc
+
+    Document = _NetProperty()
+
+
+class UIApplication:
+    def __init__(self, doc: Document):
+        self._ActiveUIDocument = UIDocument(doc)
+
+    ActiveUIDocument = _NetProperty()
+
+
+def db_module() -> types.ModuleType:
+    """The stand-in as a module named Autodesk.Revit.DB."""
+    module = types.ModuleType("Autodesk.Revit.DB")
+    for name, value in globals().items():
+        if isinstance(value, (type, types.SimpleNamespace)) and not name.startswith(
+            "_"
+        ):
+            setattr(module, name, value)
+    for name in ("Bridge", "UIApplication", "UIDocument"):
+        delattr(module, name)
+    return module
+
+
+@contextmanager
+def installed(latency: float = 0.0) -> Iterator[Bridge]:
+    """Puts the stand-in in place of the Revit API, for revitapi and for
+    any `from Autodesk.Revit import DB`, and counts its calls from zero."""
+    global bridge
+    db = db_module()
+    ui = types.ModuleType("Autodesk.Revit.UI")
+    ui.UIApplication = UIApplication  # type: ignore
+    revit = types.ModuleType("Autodesk.Revit")
+    revit.DB, revit.UI = db, ui  # type: ignore
+    autodesk = types.ModuleType("Autodesk")
+    autodesk.Revit = revit  # type: ignore
+    modules = {
+        "Autodesk": autodesk,
+        "Autodesk.Revit": revit,
+        "Autodesk.Revit.DB": db,
+        "Autodesk.Revit.UI": ui,
+    }
+
+    saved_modules = {name: sys.modules.get(name) for name in modules}
+    saved_names = {
+        name: getattr(revitapi, name, None) for name in ("DB", "UIApplication")
+    }
+    saved_bridge = bridge
+    bridge = Bridge(latency)
+    sys.modules.update(modules)
+    revitapi.DB, revitapi.UIApplication = db, UIApplication  # type: ignore
+    try:
+        yield bridge
+    finally:
+        bridge = saved_bridge
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        for name, value in saved_names.items():
+            if value is None:
+                if hasattr(revitapi, name):
+                    delattr(revitapi, name)
+            else:
+                setattr(revitapi, name, value)
+
+
+### filling a document from a RevitInfo
+
+
+def _distance_to_line(
+    point: Tuple[float, float], line: Sequence[Tuple[float, float]]
+) -> float:
+    """Distance of a point to a polyline."""
+    px, py = point
+    distance = math.inf
+    for (ax, ay), (bx, by) in zip(line, line[1:]):
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        t = ((px - ax) * dx + (py - ay) * dy) / length_sq if length_sq else 0.0
+        t = max(0.0, min(1.0, t))
+        distance = min(distance, math.hypot(px - ax - t * dx, py - ay - t * dy))
+    return distance
+
+
+def _boundary_segments(
+    rings: List[List[Tuple[float, float]]],
+    elements: Sequence[int],
+    lines: Dict[int, List[Tuple[float, float]]],
+) -> List[List[BoundarySegment]]:
+    """Boundary segments of a room, each edge of its rings a segment.
+
+    A bounding element with a line takes the free edge nearest to it, and
+    the others take the rest of the edges in turn. Edges with no element
+    get the invalid id -1, as Revit gives for boundaries of no element.
+    """
+    edges = [
+        (k, (ring[i], ring[(i + 1) % len(ring)]))
+        for k, ring in enumerate(rings)
+        for i in range(len(ring) - (1 if ring[0] == ring[-1] else 0))
+    ]
+    edges = [(k, (a, b)) for k, (a, b) in edges if a != b]
+    owners: List[int] = [-1] * len(edges)
+
+    for elem in elements:
+        if len(line := lines.get(elem) or []) < 2:
+            continue
+        free = [i for i, owner in enumerate(owners) if owner == -1]
+        if free:
+            nearest = min(
+                free,
+                key=lambda i: _distance_to_line(
+                    tuple((a + b) / 2 for a, b in zip(*edges[i][1])), line
+                ),
+            )
+            owners[nearest] = elem
+    others = itertools.cycle([elem for elem in elements if elem not in owners] or [-1])
+    owners = [next(others) if owner == -1 else owner for owner in owners]
+
+    segments: List[List[BoundarySegment]] = [[] for _ in rings]
+    for (k, (a, b)), owner in zip(edges, owners):
+        segments[k].append(BoundarySegment(owner, a, b))
+    return segments
+
+
+def fake_revit(r: RevitInfo) -> UIApplication:
+    """A Revit application with a document of the elements of a RevitInfo,
+    from which revitapi.get_revit_info would read it back.
+
+    Polylines of walls and lines (more than two points) come back as they
+    are sampled along a curve, and rings come back closed.
+    Calls to it take the latency given to installed, not one of its own.
+    """
+    doc = Document(r.doc_name or "", r.true_north)
+    next_id = itertools.count(
+        max([0, *r.rooms, *r.doors, *r.windows, *r.curtain_walls, *r.separation_lines])
+        + 1
+    )
+
+    phase = doc.add(Phase(r.phase if r.phase is not None else next(next_id), "New"))
+    doc._Phases = [phase]
+    doc.add(
+        View(
+            next(next_id),
+            "Level 1",
+            doc.categories[BuiltInCategory.OST_Views],
+            parameters={
+                BuiltInParameter.VIEW_PHASE: ElementId(phase._Id._IntegerValue)
+            },
+        )
+    )
+
+    # elements bounding each room, from revit or from the rooms of the lines
+    bounding: Dict[int, List[int]] = {
+        room: sorted(segs) for room, segs in r.boundary_segments.items()
+    }
+    for elem in r.curtain_walls + r.separation_lines:
+        for room in sorted(r.rel_rooms.get(elem, ())):
+            if elem not in bounding.setdefault(room, []):
+                bounding[room].append(elem)
+
+    rooms: Dict[int, Room] = {}
+    for id_ in r.rooms:
+        rings = r.boundaries.get(id_) or []
+        area = sum(
+            abs(
+                sum(
+                    x0 * y1 - x1 * y0
+                    for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1])
+                )
+            )
+            / 2
+            for ring in rings[:1]
+        )
+        rooms[id_] = doc.add(
+            Room(
+                id_,
+                r.names.get(id_, ""),
+                doc.categories[BuiltInCategory.OST_Rooms],
+                LocationPoint(rings[0][0]) if rings else LocationPoint((0.0, 0.0)),
+                area if rings else 1.0,
+                r.heights.get(id_, 0.0),
+                (
+                    _boundary_segments(rings, bounding.get(id_, []), r.lines)
+                    if rings
+                    else []
+                ),
+            )
+        )
+
+    for ids, category in [
+        (r.doors, BuiltInCategory.OST_Doors),
+        (r.windows, BuiltInCategory.OST_Windows),
+    ]:
+        for id_ in ids:
+            material = doc.add(Material(next(next_id), r.transparencies.get(id_, 0)))
+            symbol = doc.add(FamilySymbol(next(next_id), {material._Id: 1.0}))
+            related = [
+                rooms[room]
+                for room in sorted(r.rel_rooms.get(id_, ()))
+                if room in rooms
+            ]
+            doc.add(
+                FamilyInstance(
+                    id_,
+                    doc.categories[category],
+                    LocationPoint(point) if (point := r.points.get(id_)) else None,
+                    symbol,
+                    related[0] if related else None,
+                    related[1] if len(related) > 1 else None,
+                )
+            )
+
+    curtain = doc.add(WallType(next(next_id), WallKind.Curtain))
+    for id_ in r.curtain_walls:
+        doc.add(
+            Wall(
+                id_,
+                doc.categories[BuiltInCategory.OST_Walls],
+                LocationCurve(line) if (line := r.lines.get(id_)) else None,
+                curtain,
+            )
+        )
+    for id_ in r.separation_lines:
+        doc.add(
+            ModelCurve(
+                id_,
+                category=doc.categories[BuiltInCategory.OST_RoomSeparationLines],
+                location=LocationCurve(line) if (line := r.lines.get(id_)) else None,
+            )
+        )
+    return UIApplication(doc)
@@ -0,0 +1,451 @@
+"""Plane geometry of rings and lines in NumPy arrays, without shapely.
+
+A ring is an (n, 2) array of its vertices, closed or not.
+"""
+
+from dataclasses import dataclass
+import heapq
+import math
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+# areas smaller than this (in square feet) are only rounding errors
+AREA_TOLERANCE = 1e-9
+
+# curves are divided until every chord is this close to its curve (in feet)
+CHORD_TOLERANCE = 0.01
+# and into no more than this many points
+MAX_CURVE_POINTS = 64
+
+# fixed-point coordinates are in 0.1 mm, and a foot is 304.8 mm exactly
+UNITS_PER_FOOT = 3048
+
+
+def open_ring(ring: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """Vertices of a ring, without the closing vertex.
+
+    >>> open_ring([(0, 0), (1, 0), (0, 1), (0, 0)])
+    array([[0., 0.],
+           [1., 0.],
+           [0., 1.]])
+    """
+    ring = np.asarray(ring, dtype=float).reshape(-1, 2)
+    if len(ring) > 1 and (ring[0] == ring[-1]).all():
+        return ring[:-1]
+    return ring
+
+
+def quantize(
+    coords: Sequence[Tuple[float, float]], units_per_foot: int = UNITS_PER_FOOT
+) -> np.ndarray:
+    """Coordinates in feet, rounded to int32 in fixed units (0.1 mm).
+
+    int32 covers about 200 km from the origin, which is plenty for a building.
+
+    >>> quantize([(0.5, -1.0), (1 / 3, 1e-5)])
+    array([[ 1524, -3048],
+           [ 1016,     0]], dtype=int32)
+    """
+    units = np.rint(np.asarray(coords, dtype=float) * units_per_foot)
+    if units.size and np.abs(units).max() > np.iinfo(np.int32).max:
+        raise OverflowError("coordinates too far from the origin for int32")
+    return units.astype(np.int32)
+
+
+def dequantize(units: np.ndarray, units_per_foot: int = UNITS_PER_FOOT) -> np.ndarray:
+    """Coordinates in feet, from fixed units.
+
+    >>> dequantize(np.array([[1524, -3048]], dtype=np.int32))
+    array([[ 0.5, -1. ]])
+    """
+    return np.asarray(units, dtype=float) / units_per_foot
+
+
+def signed_area(ring: np.ndarray) -> float:
+    """Area of a ring by the shoelace formula, positive if counter-clockwise.
+
+    >>> signed_area(open_ring([(0, 0), (2, 0), (2, 1), (0, 1)]))
+    2.0
+    """
+    if len(ring) < 3:
+        return 0.0
+    x, y = ring[:, 0], ring[:, 1]
+    return float((np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2)
+
+
+def clipped_areas(rings: Sequence[np.ndarray], convexes: np.ndarray) -> np.ndarray:
+    """Areas of every ring inside every convex counter-clockwise ring.
+
+    >>> square = open_ring([(0, 0), (4, 0), (4, 4), (0, 4)])
+    >>> triangle = open_ring([(0, 0), (4, 0), (0, 4)])
+    >>> strips = np.array([[(0, 0), (1, 0), (1, 4), (0, 4)],
+    ...                    [(3, 0), (5, 0), (5, 4), (3, 4)]], dtype=float)
+    >>> clipped_areas([square, triangle], strips)
+    array([[4. , 4. ],
+           [3.5, 0.5]])
+
+    Holes are rings of their own, with their areas to be subtracted.
+    >>> hole = open_ring([(1, 1), (1, 2), (2, 2), (2, 1)])
+    >>> clipped_areas([hole], strips[:1])
+    array([[0.]])
+    """
+    ring_index, convex_index = np.divmod(
+        np.arange(len(rings) * len(convexes)), len(convexes)
+    )
+    return clipped_pair_areas(rings, convexes, ring_index, convex_index).reshape(
+        len(rings), len(convexes)
+    )
+
+
+def clipped_pair_areas(
+    rings: Sequence[np.ndarray],
+    convexes: np.ndarray,
+    ring_index: np.ndarray,
+    convex_index: np.ndarray,
+) -> np.ndarray:
+    """Areas of the rings inside the convex counter-clockwise rings, for
+    pairs of the ring_index-th ring and the convex_index-th convex ring.
+
+    Rings of the pairs are kept in one padded array with their lengths, and
+    each edge of the convex rings clips every pair at once.
+    """
+    points, lengths = _clip_pairs(rings, convexes, ring_index, convex_index)
+    return np.abs(_signed_moments(points, lengths)[0])
+
+
+def clipped_pair_moments(
+    rings: Sequence[np.ndarray],
+    convexes: np.ndarray,
+    ring_index: np.ndarray,
+    convex_index: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Areas and first moments of area (area times centroid) of the rings
+    inside the convex rings, for pairs as in clipped_pair_areas.
+
+    Both are positive whichever way a ring goes around, so those of the
+    holes can be subtracted from those of the shell.
+
+    >>> square = open_ring([(0, 0), (0, 4), (4, 4), (4, 0)])  # clockwise
+    >>> box = np.array([[(3, 3), (5, 3), (5, 5), (3, 5)]], dtype=float)
+    >>> areas, moments = clipped_pair_moments([square], box, [0], [0])
+    >>> areas, moments / areas[:, np.newaxis]
+    (array([1.]), array([[3.5, 3.5]]))
+    """
+    points, lengths = _clip_pairs(rings, convexes, ring_index, convex_index)
+    areas, moments = _signed_moments(points, lengths)
+    signs = np.where(areas < 0, -1.0, 1.0)
+    return areas * signs, moments * signs[:, np.newaxis]
+
+
+def _clip_pairs(
+    rings: Sequence[np.ndarray],
+    convexes: np.ndarray,
+    ring_index: np.ndarray,
+    convex_index: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Padded points and lengths of the rings clipped by the convex rings."""
+    ring_index = np.asarray(ring_index, dtype=np.int64)
+    convex_index = np.asarray(convex_index, dtype=np.int64)
+    if not len(ring_index):
+        return np.zeros((0, 1, 2)), np.zeros(0, dtype=np.int64)
+    width = max(len(ring) for ring in rings)
+    padded = np.zeros((len(rings), width, 2))
+    for i, ring in enumerate(rings):
+        padded[i, : len(ring)] = ring
+    points = padded[ring_index]
+    lengths = np.array([len(ring) for ring in rings])[ring_index]
+    clips = convexes[convex_index]
+
+    for k in range(clips.shape[1]):
+        a, b = clips[:, k], clips[:, (k + 1) % clips.shape[1]]
+        # the inside of a counter-clockwise edge is on its left
+        normals = np.stack([a[:, 1] - b[:, 1], b[:, 0] - a[:, 0]], axis=1)
+        points, lengths = _clip_half_planes(points, lengths, a, normals)
+    return points, lengths
+
+
+def _following(lengths: np.ndarray, width: int) -> np.ndarray:
+    """Index of the next vertex of each vertex, wrapping at each length."""
+    following = np.arange(1, width + 1)[np.newaxis, :].repeat(len(lengths), axis=0)
+    following[following >= lengths[:, np.newaxis]] = 0
+    return following
+
+
+def _clip_half_planes(
+    points: np.ndarray, lengths: np.ndarray, origins: np.ndarray, normals: np.ndarray
+):
+    """Part of each padded ring on the side of its line where the normal
+    points to, by one Sutherland-Hodgman step over all edges at once."""
+    n, width = points.shape[:2]
+    valid = np.arange(width)[np.newaxis, :] < lengths[:, np.newaxis]
+    following = np.take_along_axis(
+        points, _following(lengths, width)[:, :, np.newaxis], axis=1
+    )
+    distances = np.einsum("nwk,nk->nw", points - origins[:, np.newaxis], normals)
+    next_distances = np.einsum(
+        "nwk,nk->nw", following - origins[:, np.newaxis], normals
+    )
+    inside = (distances >= 0) & valid
+    crossing = ((distances >= 0) != (next_distances >= 0)) & valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(crossing, distances / (distances - next_distances), 0)
+    intersections = points + t[:, :, np.newaxis] * (following - points)
+    # each edge gives its start if inside, then its intersection if crossing
+    candidates = np.stack([points, intersections], axis=2).reshape(n, 2 * width, 2)
+    keep = np.stack([inside, crossing], axis=2).reshape(n, 2 * width)
+    # move the kept points to the front, in order
+    order = np.argsort(~keep, axis=1, kind="stable")
+    new_lengths = keep.sum(axis=1)
+    new_width = max(int(new_lengths.max(initial=0)), 1)
+    clipped = np.take_along_axis(candidates, order[:, :new_width, np.newaxis], axis=1)
+    return clipped, new_lengths
+
+
+def _signed_moments(
+    points: np.ndarray, lengths: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Signed areas and first moments of padded rings, by the shoelace formula."""
+    n, width = points.shape[:2]
+    valid = np.arange(width)[np.newaxis, :] < lengths[:, np.newaxis]
+    following = np.take_along_axis(
+        points, _following(lengths, width)[:, :, np.newaxis], axis=1
+    )
+    cross = points[:, :, 0] * following[:, :, 1] - following[:, :, 0] * points[:, :, 1]
+    cross = np.where(valid & (lengths[:, np.newaxis] >= 3), cross, 0)
+    areas = cross.sum(axis=1) / 2
+    moments = ((points + following) * cross[:, :, np.newaxis]).sum(axis=1) / 6
+    return areas, moments
+
+
+def side_strips(
+    line: np.ndarray, depth: float = 1
+) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """Rectangles along each edge of a line, on its left and on its right,
+    as counter-clockwise rings.
+
+    >>> left, right = side_strips(np.array([(0, 0), (0, 2)]))
+    >>> left[0]
+    array([[ 0.,  0.],
+           [ 0.,  2.],
+           [-1.,  2.],
+           [-1.,  0.]])
+    >>> right[0]
+    array([[1., 0.],
+           [1., 2.],
+           [0., 2.],
+           [0., 0.]])
+    """
+    line = np.asarray(line, dtype=float)
+    starts, ends = line[:-1], line[1:]
+    advances = ends - starts
+    lengths = np.hypot(advances[:, 0], advances[:, 1])
+    keep = lengths > 0
+    starts, ends, advances, lengths = (
+        starts[keep],
+        ends[keep],
+        advances[keep],
+        lengths[keep],
+    )
+    # unit normal to the left of each edge, times the depth
+    offsets = (
+        np.stack([-advances[:, 1], advances[:, 0]], axis=1)
+        / lengths[:, np.newaxis]
+        * abs(depth)
+    )
+    left = np.stack([starts, ends, ends + offsets, starts + offsets], axis=1)
+    right = np.stack([starts - offsets, ends - offsets, ends, starts], axis=1)
+    return list(left), list(right)
+
+
+def bounds(ring: np.ndarray) -> np.ndarray:
+    """minx, miny, maxx, maxy of a ring."""
+    return np.concatenate([ring.min(axis=0), ring.max(axis=0)])
+
+
+def bounds_overlap(a: np.ndarray, b: np.ndarray) -> bool:
+    return bool(a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3])
+
+
+def tessellate(
+    evaluate: Callable[[float], Tuple[float, float]],
+    start: float,
+    end: float,
+    tolerance: float = CHORD_TOLERANCE,
+    max_points: int = MAX_CURVE_POINTS,
+    min_divisions: int = 2,
+) -> List[Tuple[float, float]]:
+    """Points along a curve from start to end of its parameter, with every
+    chord within the tolerance of the curve, up to max_points.
+
+    The chord farthest from the curve (at the middle of its parameters) is
+    divided in two first, so a tight budget goes where the curve bends most.
+
+    >>> def arc(radius):
+    ...     return lambda t: (radius * math.cos(t), radius * math.sin(t))
+    >>> len(tessellate(arc(1), 0, math.pi / 2))
+    9
+    >>> len(tessellate(arc(10), 0, math.pi / 2))
+    33
+    >>> len(tessellate(arc(100), 0, math.pi / 2))
+    64
+
+    A straight curve has only its ends, after the first divisions.
+    >>> tessellate(lambda t: (t, 2 * t), 0, 1)
+    [(0.0, 0.0), (0.5, 1.0), (1.0, 2.0)]
+    """
+
+    def point(t: float) -> Tuple[float, float]:
+        x, y = evaluate(t)
+        return (float(x), float(y))
+
+    def chord_error(
+        a: Tuple[float, float], b: Tuple[float, float], m: Tuple[float, float]
+    ) -> float:
+        """Distance of m from the chord ab."""
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        length_sq = dx * dx + dy * dy
+        if length_sq == 0:
+            return math.hypot(m[0] - a[0], m[1] - a[1])
+        t = max(0.0, min(1.0, ((m[0] - a[0]) * dx + (m[1] - a[1]) * dy) / length_sq))
+        return math.hypot(m[0] - a[0] - t * dx, m[1] - a[1] - t * dy)
+
+    divisions = max(1, min(min_divisions, max_points - 1))
+    params = [start + (end - start) * i / divisions for i in range(divisions + 1)]
+    points = {t: point(t) for t in params}
+
+    # intervals by the largest error first, with their middles
+    heap: List[Tuple[float, float, float, float]] = []
+
+    def push(a: float, b: float) -> None:
+        m = (a + b) / 2
+        points[m] = point(m)
+        heapq.heappush(heap, (-chord_error(points[a], points[b], points[m]), a, b, m))
+
+    for a, b in zip(params, params[1:]):
+        push(a, b)
+    n_points = len(params)
+    while heap and n_points < max_points and -heap[0][0] > tolerance:
+        _, a, b, m = heapq.heappop(heap)
+        params.append(m)
+        n_points += 1
+        push(a, m)
+        push(m, b)
+    return [points[t] for t in sorted(params)]
+
+
+@dataclass(frozen=True)
+class ShapeMetrics:
+    """Sizes and shapes of polygons, an array of each for all the polygons."""
+
+    area: np.ndarray
+    perimeter: np.ndarray
+    # centroid of the area, (n, 2)
+    centroid: np.ndarray
+    # 4πA/P², 1 for a circle and smaller for longer or more jagged shapes
+    compactness: np.ndarray
+    # length over width of the ellipse of inertia, a rectangle's a/b;
+    # nan if a polygon has no area
+    aspect_ratio: np.ndarray
+
+
+def polygon_metrics(
+    coords: np.ndarray, ring_offsets: np.ndarray, polygon_ring_offsets: np.ndarray
+) -> ShapeMetrics:
+    """Metrics of polygons in flat arrays, as kept in HouseGeometry: rings
+    of vertices between ring_offsets, and polygons of rings (the shell first,
+    then the holes) between polygon_ring_offsets.
+
+    Shoelace sums run over the vertices of all the rings at once, with each
+    polygon moved to its first vertex not to lose precision far from the
+    origin. Rings may be closed or not, and go either way around.
+
+    >>> coords = np.array(
+    ...     [(0, 0), (4, 0), (4, 2), (0, 2), (1, 1), (1, 1.5), (2, 1.5), (2, 1),
+    ...      (10, 10), (13, 10), (13, 13), (10, 13), (10, 10)], dtype=float)
+    >>> m = polygon_metrics(coords, np.array([0, 4, 8, 13]), np.array([0, 2, 3]))
+    >>> m.area, m.perimeter
+    (array([7.5, 9. ]), array([15., 12.]))
+    >>> m.centroid
+    array([[ 2.03333333,  0.98333333],
+           [11.5       , 11.5       ]])
+    >>> m.compactness.round(3), m.aspect_ratio.round(3)
+    (array([0.419, 0.785]), array([2., 1.]))
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+    polygon_ring_offsets = np.asarray(polygon_ring_offsets, dtype=np.int64)
+    n_rings = len(ring_offsets) - 1
+    n_polygons = len(polygon_ring_offsets) - 1
+
+    ring_lengths = np.diff(ring_offsets)
+    ring_of_vertex = np.repeat(np.arange(n_rings), ring_lengths)
+    polygon_of_ring = np.repeat(np.arange(n_polygons), np.diff(polygon_ring_offsets))
+    has_rings = np.diff(polygon_ring_offsets) > 0
+    is_shell = np.zeros(n_rings, dtype=bool)
+    is_shell[polygon_ring_offsets[:-1][has_rings]] = True
+
+    # each polygon moved to the first vertex of its shell
+    origins = np.zeros((n_polygons, 2))
+    firsts = ring_offsets[polygon_ring_offsets[:-1][has_rings]]
+    origins[has_rings] = coords[np.minimum(firsts, max(len(coords) - 1, 0))]
+    points = coords - origins[polygon_of_ring[ring_of_vertex]]
+
+    # the next vertex of each vertex, wrapping around at the end of its ring
+    following = np.arange(1, len(points) + 1)
+    ends = ring_offsets[1:][ring_lengths > 0]
+    following[ends - 1] = ring_offsets[:-1][ring_lengths > 0]
+    x0, y0 = points[:, 0], points[:, 1]
+    x1, y1 = points[following, 0], points[following, 1]
+    cross = x0 * y1 - x1 * y0
+
+    def ring_sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(ring_of_vertex, weights=values, minlength=n_rings)
+
+    areas = ring_sum(cross) / 2
+    ring_moments = (
+        np.stack([ring_sum(cross * (x0 + x1)), ring_sum(cross * (y0 + y1))], axis=1) / 6
+    )
+    # second moments of area: ∫x², ∫y² and ∫xy
+    ring_seconds = (
+        np.stack(
+            [
+                ring_sum(cross * (x0 * x0 + x0 * x1 + x1 * x1)) * 2,
+                ring_sum(cross * (y0 * y0 + y0 * y1 + y1 * y1)) * 2,
+                ring_sum(cross * (x0 * y1 + 2 * x0 * y0 + 2 * x1 * y1 + x1 * y0)),
+            ],
+            axis=1,
+        )
+        / 24
+    )
+    ring_perimeters = ring_sum(np.hypot(x1 - x0, y1 - y0))
+
+    # shells add up and holes take away, whichever way they go around
+    signs = np.where(areas < 0, -1.0, 1.0) * np.where(is_shell, 1.0, -1.0)
+
+    def polygon_sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(polygon_of_ring, weights=values, minlength=n_polygons)
+
+    area = polygon_sum(areas * signs)
+    moments = np.stack([polygon_sum(ring_moments[:, k] * signs) for k in range(2)], 1)
+    seconds = np.stack([polygon_sum(ring_seconds[:, k] * signs) for k in range(3)], 1)
+    perimeter = polygon_sum(ring_perimeters)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centroid = moments / area[:, np.newaxis]
+        # covariances of the area around its centroid
+        cxx = seconds[:, 0] / area - centroid[:, 0] ** 2
+        cyy = seconds[:, 1] / area - centroid[:, 1] ** 2
+        cxy = seconds[:, 2] / area - centroid[:, 0] * centroid[:, 1]
+        half_sum = (cxx + cyy) / 2
+        spread = np.hypot((cxx - cyy) / 2, cxy)
+        aspect_ratio = np.sqrt((half_sum + spread) / (half_sum - spread))
+        compactness = np.where(perimeter > 0, 4 * np.pi * area / perimeter ** 2, 0)
+    has_area = area > AREA_TOLERANCE
+    return ShapeMetrics(
+        area=area,
+        perimeter=perimeter,
+        centroid=np.where(has_area[:, np.newaxis], centroid + origins, np.nan),
+        compactness=compactness,
+        aspect_ratio=np.where(has_area, aspect_ratio, np.nan),
+    )
@@ -1,4 +1,7 @@
+import base64
 from enum import Enum, auto, unique
+from functools import cached_property
+import gzip
 import json
 from pathlib import Path, PurePath
 from itertools import combinations
@@ -16,8 +19,15 @@ from typing import (
     Set,
     Tuple,
     Union,
+    get_args,
+    get_origin,
 )
 
+import numpy as np
+
+from . import geometry as geo
+
+
 # raw (as you can get) data model from Revit
 @dataclass
 class RevitInfo:
@@ -40,6 +50,78 @@ class RevitInfo:
     lines: Dict[int, List[Tuple[float, float]]] = field(default_factory=dict)
     boundaries: Dict[int, List[List[Tuple[float, float]]]] = field(default_factory=dict)
 
+    def to_json(self, path: Union[str, Path, PurePath]):
+        """Saves a snapshot in compact JSON, gzipped if the path ends with .gz.
+
+        >>> import tempfile
+        >>> r = RevitInfo(
+        ...     rooms=[1, 2],
+        ...     doors=[10],
+        ...     rel_rooms={10: {1, 2}},
+        ...     points={10: (0.5, 1.0)},
+        ...     boundaries={1: [[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]]},
+        ... )
+        >>> with tempfile.TemporaryDirectory() as tmp:
+        ...     r.to_json(Path(tmp) / "snapshot.json.gz")
+        ...     loaded = RevitInfo.from_json(Path(tmp) / "snapshot.json.gz")
+
+        Int keys, sets and tuples are restored as they were.
+        >>> loaded == r, loaded.rel_rooms, loaded.points
+        (True, {10: {1, 2}}, {10: (0.5, 1.0)})
+        """
+        filepath = Path(path)
+        if not filepath.parent.exists():
+            filepath.parent.mkdir(parents=True)
+
+        open_ = gzip.open if filepath.suffix == ".gz" else open
+        with open_(str(filepath), "wt", encoding="utf-8") as file:
+            json.dump(
+                dataclasses.asdict(self),
+                file,
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=_sorted_list,
+            )
+
+    @classmethod
+    def from_json(cls, path: Union[str, Path, PurePath]) -> "RevitInfo":
+        open_ = gzip.open if PurePath(path).suffix == ".gz" else open
+        with open_(str(path), "rt", encoding="utf-8") as file:
+            obj = json.load(file)
+        return cls(
+            **{
+                f.name: _as_type(obj[f.name], f.type)
+                for f in dataclasses.fields(cls)
+                if f.name in obj
+            }
+        )
+
+
+def _sorted_list(obj: Any) -> List[Any]:
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(type(obj))
+
+
+def _as_type(value: Any, type_: Any) -> Any:
+    """Converts a value loaded from JSON to the type of a RevitInfo field:
+    int keys of dicts, sets, and tuples, which JSON doesn't have."""
+    origin, args = get_origin(type_), get_args(type_)
+    if value is None:
+        return None
+    elif origin is Union:  # Optional
+        return _as_type(value, next(arg for arg in args if arg is not type(None)))
+    elif origin is dict:
+        key_type, value_type = args
+        return {key_type(k): _as_type(v, value_type) for k, v in value.items()}
+    elif origin is list:
+        return [_as_type(v, args[0]) for v in value]
+    elif origin is set:
+        return {_as_type(v, args[0]) for v in value}
+    elif origin is tuple:
+        return tuple(_as_type(v, arg) for v, arg in zip(value, args))
+    return value
+
 
 ### Dataclasses for the housing model
 
@@ -218,6 +300,18 @@ class Room:
     name: str = field(compare=False)
     height: Length = field(compare=False)
 
+    # sizes and shapes of the room, if its boundary is known
+    # area in square meters
+    area: Optional[float] = field(default=None, compare=False, repr=False)
+    perimeter: Optional[Length] = field(default=None, compare=False, repr=False)
+    # in feet, in the coordinates of the Revit model
+    centroid: Optional[Tuple[float, float]] = field(
+        default=None, compare=False, repr=False
+    )
+    # see geometry.ShapeMetrics
+    compactness: Optional[float] = field(default=None, compare=False, repr=False)
+    aspect_ratio: Optional[float] = field(default=None, compare=False, repr=False)
+
 
 @dataclass(frozen=True)
 class Glazing:
@@ -255,6 +349,185 @@ class RoomGlazingRelation:
     facings: Tuple[Direction, ...] = field(compare=False)
 
 
+@dataclass(frozen=True, eq=False)
+class HouseGeometry:
+    """Shapes of the rooms and glazings of a house, in flat coordinate arrays.
+
+    Coordinates are 2d, in feet as in Revit. Rings of every room are kept
+    in one array of vertices, with offsets in the manner of columnar formats:
+    vertices of the i-th ring are `coords[ring_offsets[i]:ring_offsets[i + 1]]`,
+    and rings of the j-th room are `room_ring_offsets[j]` up to
+    `room_ring_offsets[j + 1]`, the shell first then its holes.
+    A glazing has one vertex if it is a point (a door or a window),
+    or the vertices of its line.
+    Coordinates can also be int32 in fixed units (geo.quantize), a quarter
+    of the memory of Python floats, and exact to compare and hash.
+
+    >>> geometry = HouseGeometry.from_shapes(
+    ...     {1: [[(0, 0), (4, 0), (4, 4), (0, 4)], [(1, 1), (2, 1), (2, 2)]]},
+    ...     {10: (2, 0)},
+    ...     {11: [(4, 0), (4, 4)]},
+    ... )
+    >>> geometry.ring_offsets, geometry.room_ring_offsets
+    (array([0, 4, 7]), array([0, 2]))
+    >>> geometry.rings(1)[1]
+    array([[1., 1.],
+           [2., 1.],
+           [2., 2.]])
+
+    Shapely objects are made only when asked for, once.
+    >>> geometry.polygons[1].area
+    15.5
+    >>> geometry.glazing_shapes[10].wkt, geometry.glazing_shapes[11].length
+    ('POINT (2 0)', 4.0)
+
+    Arrays are kept as they are given, so they can be views of a buffer.
+    >>> buffers = geometry.to_buffers()
+    >>> HouseGeometry.from_buffers(buffers).coords is buffers["coords"]
+    True
+
+    A house keeps its geometry in JSON, though not in comparisons.
+    >>> House(geometry=geometry).to_json("test.json")
+    >>> loaded = House.from_json("test.json").geometry
+    >>> np.array_equal(loaded.coords, geometry.coords), loaded.coords.dtype
+    (True, dtype('float64'))
+
+    Quantized coordinates are given back in feet.
+    >>> quantized = geometry.quantized()
+    >>> quantized.coords.dtype, quantized.coords[1]
+    (dtype('int32'), array([12192,     0], dtype=int32))
+    >>> quantized.rings(1)[0][1], quantized.polygons[1].area
+    (array([4., 0.]), 15.5)
+    """
+
+    room_ids: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    room_ring_offsets: np.ndarray = field(default_factory=lambda: np.zeros(1, np.int64))
+    ring_offsets: np.ndarray = field(default_factory=lambda: np.zeros(1, np.int64))
+    coords: np.ndarray = field(default_factory=lambda: np.zeros((0, 2)))
+    glazing_ids: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    glazing_offsets: np.ndarray = field(default_factory=lambda: np.zeros(1, np.int64))
+    glazing_coords: np.ndarray = field(default_factory=lambda: np.zeros((0, 2)))
+
+    @classmethod
+    def from_shapes(
+        cls,
+        boundaries: Dict[int, List[List[Tuple[float, float]]]],
+        points: Dict[int, Tuple[float, float]],
+        lines: Dict[int, List[Tuple[float, float]]],
+        quantize: bool = False,
+    ) -> "HouseGeometry":
+        """Geometry from the shapes of a RevitInfo, for the given elements."""
+        rings = [ring for rings in boundaries.values() for ring in rings]
+        shapes = [[point] for point in points.values()] + list(lines.values())
+        geometry = cls(
+            room_ids=np.array(list(boundaries), dtype=np.int64),
+            room_ring_offsets=_offsets(len(rings) for rings in boundaries.values()),
+            ring_offsets=_offsets(len(ring) for ring in rings),
+            coords=_points(xy for ring in rings for xy in ring),
+            glazing_ids=np.array([*points, *lines], dtype=np.int64),
+            glazing_offsets=_offsets(len(shape) for shape in shapes),
+            glazing_coords=_points(xy for shape in shapes for xy in shape),
+        )
+        return geometry.quantized() if quantize else geometry
+
+    @property
+    def is_quantized(self) -> bool:
+        return bool(np.issubdtype(self.coords.dtype, np.integer))
+
+    def quantized(self) -> "HouseGeometry":
+        """The same geometry with int32 coordinates in fixed units."""
+        if self.is_quantized:
+            return self
+        return dataclasses.replace(
+            self,
+            coords=geo.quantize(self.coords),
+            glazing_coords=geo.quantize(self.glazing_coords),
+        )
+
+    def room_metrics(self) -> geo.ShapeMetrics:
+        """Areas, perimeters, centroids and shapes of the rooms, in feet,
+        in the order of room_ids.
+
+        >>> geometry = HouseGeometry.from_shapes(
+        ...     {1: [[(0, 0), (4, 0), (4, 2), (0, 2)]]}, {}, {}, quantize=True
+        ... )
+        >>> metrics = geometry.room_metrics()
+        >>> metrics.area, metrics.centroid, metrics.aspect_ratio
+        (array([8.]), array([[2., 1.]]), array([2.]))
+        """
+        return geo.polygon_metrics(
+            self._feet(self.coords), self.ring_offsets, self.room_ring_offsets
+        )
+
+    def _feet(self, coords: np.ndarray) -> np.ndarray:
+        return geo.dequantize(coords) if self.is_quantized else coords
+
+    @classmethod
+    def from_buffers(cls, buffers: Dict[str, Any]) -> "HouseGeometry":
+        """Geometry from arrays or buffers by field names, without copying
+        (like columns of a table, or arrays of an npz file)."""
+        return cls(
+            **{f.name: np.asarray(buffers[f.name]) for f in dataclasses.fields(cls)}
+        )
+
+    def to_buffers(self) -> Dict[str, np.ndarray]:
+        return {f.name: getattr(self, f.name) for f in dataclasses.fields(self)}
+
+    @cached_property
+    def _room_index(self) -> Dict[int, int]:
+        return {room: i for i, room in enumerate(self.room_ids.tolist())}
+
+    @cached_property
+    def _glazing_index(self) -> Dict[int, int]:
+        return {glazing: i for i, glazing in enumerate(self.glazing_ids.tolist())}
+
+    def rings(self, room_id: int) -> List[np.ndarray]:
+        """Rings of a room in feet, as views of the coordinates unless quantized."""
+        i = self._room_index[room_id]
+        start, end = self.room_ring_offsets[i], self.room_ring_offsets[i + 1]
+        return [
+            self._feet(self.coords[self.ring_offsets[k] : self.ring_offsets[k + 1]])
+            for k in range(start, end)
+        ]
+
+    def shape(self, glazing_id: int) -> np.ndarray:
+        """Vertices of a glazing in feet, as a view unless quantized."""
+        i = self._glazing_index[glazing_id]
+        start, end = self.glazing_offsets[i], self.glazing_offsets[i + 1]
+        return self._feet(self.glazing_coords[start:end])
+
+    @cached_property
+    def polygons(self) -> Dict[int, Any]:
+        """Shapely polygons of the rooms."""
+        from shapely.geometry import Polygon
+
+        polygons: Dict[int, Any] = {}
+        for room in self._room_index:
+            shell, *holes = self.rings(room)
+            polygons[room] = Polygon(shell, holes)
+        return polygons
+
+    @cached_property
+    def glazing_shapes(self) -> Dict[int, Any]:
+        """Shapely points or line strings of the glazings."""
+        from shapely.geometry import LineString, Point
+
+        return {
+            glazing: Point(*coords[0]) if len(coords) == 1 else LineString(coords)
+            for glazing in self._glazing_index
+            if len(coords := self.shape(glazing))
+        }
+
+
+def _offsets(lengths: Iterable[int]) -> np.ndarray:
+    offsets = np.zeros(1, dtype=np.int64)
+    return np.concatenate([offsets, np.cumsum(list(lengths), dtype=np.int64)])
+
+
+def _points(xys: Iterable[Tuple[float, float]]) -> np.ndarray:
+    return np.array(list(xys), dtype=float).reshape(-1, 2)
+
+
 @dataclass(frozen=True)
 class House:
     """Model of a house for the housing DNA analysis.
@@ -319,6 +592,8 @@ class House:
     room_connections: Tuple[RoomConnection, ...] = tuple()
     glazings: Tuple[Glazing, ...] = tuple()
     room_glazing_relations: Tuple[RoomGlazingRelation, ...] = tuple()
+    # shapes of the rooms and glazings, if kept
+    geometry: Optional[HouseGeometry] = field(default=None, compare=False, repr=False)
 
     def to_json(self, path: Union[str, Path, PurePath]):
         filepath = Path(path)
@@ -377,8 +652,19 @@ def as_nested_dict(obj: DC):
 
     Enums will be converted to dicts, with the key "__enum__" that has a value
     of `str(obj)`.
+
+    NumPy arrays will be converted to dicts, with the key "__ndarray__" that
+    has a value of their bytes in base64, along with their dtype and shape.
     """
-    if is_dataclass_instance(obj):
+    if isinstance(obj, np.ndarray):
+        array = np.ascontiguousarray(obj)
+        return {
+            "__ndarray__": base64.b64encode(array.tobytes()).decode("ascii"),
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+
+    elif is_dataclass_instance(obj):
         result_list: List[Tuple[str, DC]] = []
         for f in dataclasses.fields(obj):
             # recursive
@@ -428,6 +714,10 @@ def to_nested_dataclass(obj: ND):
     a string representation of an enum. Those dicts will be converted back to
     enum member of matching class and names.
 
+    Dicts that are converted from NumPy arrays have a key named "__ndarray__".
+    Those dicts will be converted back to read-only arrays over the decoded
+    bytes, without another copy.
+
     Lists and tuples (which were saved as JSON arrays) are converted to tuples.
     """
 
@@ -446,6 +736,11 @@ def to_nested_dataclass(obj: ND):
             name, member = repr.split(".")
             if issubclass(class_ := globals()[name], Enum):
                 return getattr(class_, member)
+        elif "__ndarray__" in obj:
+            data = base64.b64decode(obj["__ndarray__"])  # type: ignore
+            return np.frombuffer(data, dtype=obj["dtype"]).reshape(  # type: ignore
+                obj["shape"]  # type: ignore
+            )
         else:
             return_dict: Dict[E, DC] = {
                 key: to_nested_dataclass(obj[key]) for key in obj
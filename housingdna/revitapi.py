@@ -1,5 +1,8 @@
 #! python3
 
+# annotations of Revit types are not evaluated, so this can be imported without Revit
+from __future__ import annotations
+
 from typing import (
     List,
     Tuple,
@@ -7,8 +10,10 @@ from typing import (
     Optional,
 )
 import itertools
+import math
 from pathlib import PurePath
 
+from .geometry import CHORD_TOLERANCE, MAX_CURVE_POINTS, tessellate
 from .model import RevitInfo
 
 ### if it's already used by pyrevit...
@@ -361,29 +366,60 @@ def pick_phase_by_views(doc: DB.Document) -> int:
     return int(max(reversed(phases), key=view_phases.count))
 
 
-def eval_curve(curve: DB.Curve, first=False, division=8) -> List[Tuple[float, float]]:
-    points = []
+def eval_curve(
+    curve: DB.Curve,
+    first=False,
+    tolerance=CHORD_TOLERANCE,
+    max_points=MAX_CURVE_POINTS,
+) -> List[Tuple[float, float]]:
+    """Points along a curve, as many as it needs to be within the tolerance.
+
+    >>> class XYZ:
+    ...     def __init__(self, x, y):
+    ...         self.X, self.Y = x, y
+    >>> class Arc:  # stands in for a quarter of DB.Arc
+    ...     IsBound = True
+    ...     def __init__(self, radius):
+    ...         self.radius = radius
+    ...     def GetEndParameter(self, i):
+    ...         return [0, math.pi / 2][i]
+    ...     def Evaluate(self, param, normalized):
+    ...         r = self.radius
+    ...         return XYZ(r * math.cos(param), r * math.sin(param))
+
+    A large arc gets more points than a small fillet.
+    >>> len(eval_curve(Arc(10), first=True)), len(eval_curve(Arc(0.25), first=True))
+    (33, 5)
+    >>> eval_curve(Arc(0.25))[0] == eval_curve(Arc(0.25), first=True)[1]
+    True
+    """
 
     if curve.IsBound:
         param_start = curve.GetEndParameter(0)
         param_end = curve.GetEndParameter(1)
+        min_divisions = 2
     elif isinstance(curve, (DB.Arc, DB.Ellipse)):  # unbound arc: circle or ellipse
         param_start = 0
         param_end = 2 * math.pi
+        min_divisions = 4  # not to start from a chord of no length
     else:
         raise  # no unbound spline, or etc.
 
-    d_param = (param_end - param_start) / division
+    def evaluate(param: float) -> Tuple[float, float]:
+        point = curve.Evaluate(param, False)
+        return (float(point.X), float(point.Y))
 
-    for i in range(0 if first else 1, division + 1):
-        point = curve.Evaluate(param_start + i * d_param, False)
-        points.append((float(point.X), float(point.Y)))
-
-    return points
+    points = tessellate(
+        evaluate, param_start, param_end, tolerance, max_points, min_divisions
+    )
+    return points if first else points[1:]
 
 
 def get_points_2d(
-    curve: DB.Curve, first=False, division=8
+    curve: DB.Curve,
+    first=False,
+    tolerance=CHORD_TOLERANCE,
+    max_points=MAX_CURVE_POINTS,
 ) -> List[Tuple[float, float]]:
     if isinstance(curve, DB.Line):
         if curve.IsBound:
@@ -397,7 +433,7 @@ def get_points_2d(
         else:
             raise  # no unbound line
     else:
-        return eval_curve(curve, first, division)
+        return eval_curve(curve, first, tolerance, max_points)
 
 
 def get_location_2d(
@@ -422,7 +458,7 @@ def get_location_2d(
 
 def get_shape_2d(
     elem: Union[int, DB.ElementId, DB.Wall, DB.ModelCurve],
-    division=8,
+    tolerance=CHORD_TOLERANCE,
     doc: Optional[DB.Document] = None,
 ) -> Optional[List[Tuple[float, float]]]:
     if isinstance(elem, (int, DB.ElementId)):
@@ -435,14 +471,14 @@ def get_shape_2d(
     # assuming a wall or a separation line
 
     try:
-        return get_points_2d(elem.Location.Curve, first=True)
+        return get_points_2d(elem.Location.Curve, first=True, tolerance=tolerance)
     except:
         return None
 
 
 def get_boundary_2d(
     elem: Union[int, DB.ElementId, DB.SpatialElement],
-    division=8,
+    tolerance=CHORD_TOLERANCE,
     doc: Optional[DB.Document] = None,
 ) -> Optional[List[List[Tuple[float, float]]]]:
     if isinstance(elem, (int, DB.ElementId)):
@@ -470,7 +506,7 @@ def get_boundary_2d(
             ring = []
             for seg in seglist:
                 curve = seg.GetCurve()
-                ring.extend(get_points_2d(curve, first, division))
+                ring.extend(get_points_2d(curve, first, tolerance))
 
                 first = False
 
@@ -3,7 +3,6 @@ from .type import N
 from collections import Counter
 
 import numpy as np
-import networkx as nx
 
 from ..model import (
     Direction,
@@ -23,7 +22,7 @@ from .name import (
     is_living,
     judge_by_name,
 )
-from .glazing_network import analyze_sun_order
+from .light import WIDE_SUN_DIRECTIONS, light_index
 
 
 def dnas_attribute(
@@ -66,27 +65,6 @@ def is_mbr(room: Room) -> bool:
 def room_outmost_win_count(
     model: House, rels: Sequence[RoomGlazingRelation]
 ) -> List[N]:
-    G: nx.DiGraph = nx.DiGraph()
-    # assuming mid-latitude northern hemisphere
-    sun_directions = [
-        Direction.SOUTH,
-        Direction.SOUTHEAST,
-        Direction.SOUTHWEST,
-        Direction.EAST,
-        Direction.WEST,
-    ]
-    opposite_directions = [d.opposite() for d in sun_directions]
-    edges = [
-        (rel.room_id, rel.glazing_id)
-        for rel in model.room_glazing_relations
-        if any((facing in sun_directions) for facing in rel.facings)
-    ] + [
-        (rel.glazing_id, rel.room_id)
-        for rel in model.room_glazing_relations
-        if any((facing in opposite_directions) for facing in rel.facings)
-    ]
-    G.add_edges_from(edges)
-
     inner_window_list = [
         g.element_id
         for g in model.glazings
@@ -100,11 +78,9 @@ def room_outmost_win_count(
         window for window, facings in window_facings.items() if multiple_sides(facings)
     ]
 
-    outmost_list = [g.element_id for g in model.glazings if g.outmost]
-    sun_dict_win = {
-        win.element_id: analyze_sun_order(G, outmost_list, win.element_id)
-        for win in model.glazings
-    }
+    sun_dict_win = light_index(model).sun_orders(
+        WIDE_SUN_DIRECTIONS, [win.element_id for win in model.glazings]
+    )
     except_open = [
         g.element_id
         for g in model.glazings
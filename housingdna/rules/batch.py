@@ -0,0 +1,142 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..model import Direction, House
+from .csr import CSRGraph
+from .name import is_entrance
+from .room_network import room_graph
+from .light import SUN_DIRECTIONS, light_index
+
+
+class GraphBatch:
+    """Many graphs packed into one block-diagonal CSR graph.
+
+    Slots of the k-th graph come after the slots of the graphs before it, so
+    a traversal of the packed graph is a traversal of every graph at once.
+
+    >>> a = CSRGraph.from_edges([(1, 2), (2, 3)])
+    >>> b = CSRGraph.from_edges([(1, 2)], nodes=[4])
+    >>> batch = GraphBatch([a, b])
+    >>> batch.offsets
+    array([0, 3, 6])
+    >>> batch.depths([[1], [2]])
+    [array([0, 1, 2], dtype=int32), array([-1,  1,  0], dtype=int32)]
+    >>> batch.components()
+    [array([0, 0, 0]), array([0, 1, 1])]
+    """
+
+    def __init__(self, graphs: Sequence[CSRGraph]):
+        self.graphs = list(graphs)
+        sizes = [len(g) for g in self.graphs]
+        self.offsets: np.ndarray = np.concatenate([[0], np.cumsum(sizes)]).astype(
+            np.int64
+        )
+        total = int(self.offsets[-1])
+
+        edge_counts = [len(g.indices) for g in self.graphs]
+        edge_offsets = np.concatenate([[0], np.cumsum(edge_counts)])
+        indptr = np.concatenate(
+            [g.indptr[:-1] + eo for g, eo in zip(self.graphs, edge_offsets)]
+            + [[edge_offsets[-1]]]
+        ).astype(np.int32)
+        indices = np.concatenate(
+            [g.indices + o for g, o in zip(self.graphs, self.offsets)]
+            + [np.zeros(0, dtype=np.int32)]
+        ).astype(np.int32)
+
+        directed = any(g.directed for g in self.graphs)
+        self.graph = CSRGraph(list(range(total)), indptr, indices, directed)
+
+    def __len__(self) -> int:
+        return len(self.graphs)
+
+    def split(self, values: np.ndarray) -> List[np.ndarray]:
+        """Split an array over the packed slots into an array per graph."""
+        return np.split(values, self.offsets[1:-1])
+
+    def slots(self, nodes_per_graph: Sequence[Iterable[int]]) -> np.ndarray:
+        """Packed slots of the nodes of each graph, skipping unknown nodes."""
+        return np.concatenate(
+            [
+                g.slots(nodes) + offset
+                for g, nodes, offset in zip(self.graphs, nodes_per_graph, self.offsets)
+            ]
+            + [np.zeros(0, dtype=np.int64)]
+        ).astype(np.int64)
+
+    def reverse(self) -> "GraphBatch":
+        return GraphBatch([g.reverse() for g in self.graphs])
+
+    def depths(
+        self, sources_per_graph: Sequence[Iterable[int]], cutoff: Optional[int] = None
+    ) -> List[np.ndarray]:
+        """Depths from the nearest source of its own graph, -1 if unreachable,
+        in the slot order of each graph."""
+        return self.split(self.graph.bfs(self.slots(sources_per_graph), cutoff))
+
+    def components(self) -> List[np.ndarray]:
+        """Component labels of each graph, numbered from 0 within the graph."""
+        labels = self.graph.components()
+        sizes = np.diff(self.offsets)
+        # the first slot of a graph has the smallest label in the graph
+        firsts = labels[self.offsets[:-1][sizes > 0]]
+        return self.split(labels - np.repeat(firsts, sizes[sizes > 0]))
+
+
+def batch_sun_orders(
+    models: Sequence[House],
+    sun_directions: Sequence[Direction] = SUN_DIRECTIONS,
+    max_order: int = 9,
+) -> List[Dict[int, int]]:
+    """Sun orders of the rooms of every house, as `LightIndex.sun_orders` would give.
+
+    All houses are searched together, along the light from their outmost glazings.
+    """
+    lights = [
+        light_index(model, max_order).light_graph(sun_directions) for model in models
+    ]
+    batch = GraphBatch([light for light, _ in lights])
+    depths = batch.depths([sources for _, sources in lights], cutoff=max_order)
+    orders: List[Dict[int, int]] = []
+    for model, graph, d in zip(models, batch.graphs, depths):
+        d = np.where((d >= 0) & (d < max_order), d, max_order)
+        orders.append(
+            {
+                room.element_id: (
+                    int(d[i])
+                    if (i := graph.index.get(room.element_id)) is not None
+                    else max_order
+                )
+                for room in model.rooms
+            }
+        )
+    return orders
+
+
+def batch_entrance_depths(models: Sequence[House]) -> List[Dict[int, Optional[int]]]:
+    """Depths of the rooms of every house from their closest entrance,
+    None for rooms that can't be reached, as `RoomDepths.depth_map` would give."""
+    batch = GraphBatch([room_graph(model) for model in models])
+    depths = batch.depths(
+        [
+            [room.element_id for room in model.rooms if is_entrance(room)]
+            for model in models
+        ]
+    )
+    return [
+        {
+            node: int(depth) if depth >= 0 else None
+            for node, depth in zip(graph.nodes, d)
+        }
+        for graph, d in zip(batch.graphs, depths)
+    ]
+
+
+def batch_room_components(models: Sequence[House]) -> List[Dict[int, int]]:
+    """Label of the connected component of each room in every house."""
+    batch = GraphBatch([room_graph(model) for model in models])
+    return [
+        {node: int(label) for node, label in zip(graph.nodes, labels)}
+        for graph, labels in zip(batch.graphs, batch.components())
+    ]
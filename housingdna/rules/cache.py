@@ -0,0 +1,42 @@
+from functools import wraps
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+from ..model import House
+
+T = TypeVar("T")
+
+
+def house_cache(func: Callable[..., T]) -> Callable[..., T]:
+    """Computes a function of a house once, and keeps it on the house itself.
+
+    The cache is found by the identity of the house, so a house is neither
+    hashed nor compared on every call. Equal houses don't share it either:
+    houses are equal even with different facings or outmost glazings,
+    as those fields are left out of the comparison.
+    A house is frozen, so what was computed holds as long as the house lives.
+
+    >>> calls = []
+    >>> @house_cache
+    ... def n_rooms(model: House, scale: int = 1) -> int:
+    ...     calls.append(scale)
+    ...     return len(model.rooms) * scale
+    >>> house = House()
+    >>> n_rooms(house), n_rooms(house), n_rooms(house, 2), calls
+    (0, 0, 0, [1, 2])
+    >>> n_rooms(House()), calls
+    (0, [1, 2, 1])
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @wraps(func)
+    def cached(model: House, *args: Any) -> T:
+        # not a field, so it is not compared, printed nor saved with the house
+        cache: Dict[Tuple[str, Tuple[Any, ...]], Any] = model.__dict__.setdefault(
+            "_cache", {}
+        )
+        key = (name, args)
+        if key not in cache:
+            cache[key] = func(model, *args)
+        return cache[key]
+
+    return cached
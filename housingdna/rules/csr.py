@@ -0,0 +1,277 @@
+from collections import deque
+from functools import cached_property
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# graphs up to this many nodes are walked in plain Python, as a house usually
+# has a few dozen rooms and glazings, too few to pay off the overhead of NumPy
+SMALL_GRAPH: int = 64
+
+
+class CSRGraph:
+    """A house-sized graph of int node ids, in compressed sparse rows.
+
+    Node ids are remapped to slots 0 to n-1, in the order they first appear.
+    The successors of the slot i are `indices[indptr[i]:indptr[i + 1]]`.
+    An undirected graph keeps each edge in both directions.
+
+    >>> g = CSRGraph.from_edges([(10, 20), (20, 30)], nodes=[40])
+    >>> g.nodes
+    [40, 10, 20, 30]
+    >>> g.indptr
+    array([0, 0, 1, 3, 4], dtype=int32)
+    >>> g.indices
+    array([2, 1, 3, 2], dtype=int32)
+    >>> g.successors(20)
+    [10, 30]
+
+    Edges of a directed graph are kept only in their own direction.
+    >>> d = CSRGraph.from_edges([(10, 20), (20, 30)], directed=True)
+    >>> d.successors(20), d.reverse().successors(20)
+    ([30], [10])
+    """
+
+    def __init__(
+        self,
+        nodes: List[int],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        directed: bool = False,
+    ):
+        self.nodes = nodes
+        self.index: Dict[int, int] = {node: i for i, node in enumerate(nodes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.directed = directed
+
+    @cached_property
+    def edge_sources(self) -> np.ndarray:
+        """The slot each edge comes from, for gathering a whole frontier at once."""
+        return np.repeat(
+            np.arange(len(self.nodes), dtype=np.int32), np.diff(self.indptr)
+        )
+
+    @classmethod
+    def from_edges(
+        cls,
+        edges: Iterable[Tuple[int, int]],
+        nodes: Iterable[int] = (),
+        directed: bool = False,
+    ) -> "CSRGraph":
+        index: Dict[int, int] = {}
+        for node in nodes:
+            index.setdefault(node, len(index))
+        pairs = [
+            (index.setdefault(a, len(index)), index.setdefault(b, len(index)))
+            for a, b in edges
+        ]
+        if len(index) <= SMALL_GRAPH:
+            return cls._from_pair_list(list(index), pairs, directed)
+        return cls.from_slot_pairs(
+            list(index), np.array(pairs, dtype=np.int32).reshape(-1, 2), directed
+        )
+
+    @classmethod
+    def from_id_pairs(cls, pairs: np.ndarray, directed: bool = False) -> "CSRGraph":
+        """Graph of an (n, 2) array of node id pairs, with nodes in id order.
+
+        >>> CSRGraph.from_id_pairs(np.array([[30, 10], [10, 20]])).nodes
+        [10, 20, 30]
+        """
+        ids, slots = np.unique(pairs, return_inverse=True)
+        return cls.from_slot_pairs(
+            ids.tolist(), slots.reshape(-1, 2).astype(np.int32), directed
+        )
+
+    @classmethod
+    def from_slot_pairs(
+        cls, nodes: List[int], pairs: np.ndarray, directed: bool = False
+    ) -> "CSRGraph":
+        if len(nodes) <= SMALL_GRAPH:
+            return cls._from_pair_list(nodes, pairs.tolist(), directed)
+        if not directed:
+            pairs = np.concatenate([pairs, pairs[:, ::-1]])
+        # sorted by the source, then by the target, without duplicates
+        n = max(len(nodes), 1)
+        keys = np.unique(pairs[:, 0].astype(np.int64) * n + pairs[:, 1])
+        sources, targets = np.divmod(keys, n)
+        counts = np.bincount(sources, minlength=len(nodes))
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int32)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(nodes, indptr, targets.astype(np.int32), directed)
+
+    @classmethod
+    def _from_pair_list(
+        cls, nodes: List[int], pairs: List[List[int]], directed: bool
+    ) -> "CSRGraph":
+        edges = set(map(tuple, pairs))
+        if not directed:
+            edges.update((b, a) for a, b in pairs)
+        edges = sorted(edges)
+        counts = [0] * (len(nodes) + 1)
+        for a, _ in edges:
+            counts[a + 1] += 1
+        return cls(
+            nodes,
+            np.array(list(accumulate(counts)), dtype=np.int32),
+            np.array([b for _, b in edges], dtype=np.int32),
+            directed,
+        )
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node: int) -> bool:
+        return node in self.index
+
+    def slots(self, nodes: Iterable[int]) -> np.ndarray:
+        """Slots of the given nodes, skipping the nodes not in the graph."""
+        return np.array(
+            [self.index[node] for node in nodes if node in self.index],
+            dtype=np.int32,
+        )
+
+    @cached_property
+    def adjacency(self) -> List[List[int]]:
+        """Successor slots of every slot, as lists to walk in plain Python."""
+        indices = self.indices.tolist()
+        bounds = self.indptr.tolist()
+        return [indices[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def successors(self, node: int) -> List[int]:
+        return [self.nodes[j] for j in self.adjacency[self.index[node]]]
+
+    def reverse(self) -> "CSRGraph":
+        if not self.directed:
+            return self
+        pairs = np.stack([self.indices, self.edge_sources], axis=1)
+        return CSRGraph.from_slot_pairs(self.nodes, pairs, directed=True)
+
+    def bfs(self, sources: np.ndarray, cutoff: Optional[int] = None) -> np.ndarray:
+        """Depths of every slot from the nearest of the source slots, -1 if
+        unreachable. Each step advances the whole frontier at once.
+
+        >>> g = CSRGraph.from_edges([(1, 2), (2, 3)], nodes=[4])
+        >>> g.bfs(g.slots([1]))
+        array([-1,  0,  1,  2], dtype=int32)
+        >>> g.bfs(g.slots([1, 3]), cutoff=0)
+        array([-1,  0, -1,  0], dtype=int32)
+
+        Small graphs are walked in plain Python instead, to the same depths.
+        >>> path = CSRGraph.from_edges([(i, i + 1) for i in range(2 * SMALL_GRAPH)])
+        >>> path.bfs(path.slots([0]), cutoff=100)[98:102]
+        array([ 98,  99, 100,  -1], dtype=int32)
+        """
+
+        if len(self.nodes) <= SMALL_GRAPH:
+            row = [-1] * len(self.nodes)
+            for i, depth in self.walk(sources.tolist(), cutoff).items():
+                row[i] = depth
+            return np.array(row, dtype=np.int32)
+
+        depths = np.full(len(self.nodes), -1, dtype=np.int32)
+        frontier = np.zeros(len(self.nodes), dtype=bool)
+        frontier[sources] = True
+        depths[frontier] = 0
+
+        depth = 0
+        while frontier.any() and (cutoff is None or depth < cutoff):
+            depth += 1
+            reached = np.zeros(len(self.nodes), dtype=bool)
+            reached[self.indices[frontier[self.edge_sources]]] = True
+            frontier = reached & (depths < 0)
+            depths[frontier] = depth
+        return depths
+
+    def walk(
+        self, sources: Iterable[int], cutoff: Optional[int] = None
+    ) -> Dict[int, int]:
+        """Depths of the reachable slots from the nearest of the source slots,
+        in a plain breadth-first search, in the order they are reached.
+
+        >>> g = CSRGraph.from_edges([(1, 2), (2, 3)], nodes=[4])
+        >>> g.walk([1])
+        {1: 0, 2: 1, 3: 2}
+        """
+
+        depths: Dict[int, int] = {}
+        queue = deque()
+        for i in sources:
+            if i not in depths:
+                depths[i] = 0
+                queue.append(i)
+        adjacency = self.adjacency
+        while queue:
+            i = queue.popleft()
+            depth = depths[i] + 1
+            if cutoff is not None and depth > cutoff:
+                break
+            for j in adjacency[i]:
+                if j not in depths:
+                    depths[j] = depth
+                    queue.append(j)
+        return depths
+
+    def components(self) -> np.ndarray:
+        """Component label of every slot, numbered from 0 in order of slots.
+        A directed graph is taken as undirected (weak components).
+
+        >>> CSRGraph.from_edges([(1, 2), (3, 4), (4, 5)], nodes=[6]).components()
+        array([0, 1, 1, 2, 2, 2])
+        """
+
+        labels = np.arange(len(self.nodes))
+        sources, targets = self.edge_sources, self.indices
+        while True:
+            # propagate the smallest label over the edges, both ways
+            new = labels.copy()
+            np.minimum.at(new, targets, labels[sources])
+            np.minimum.at(new, sources, labels[targets])
+            new = new[new]  # jump to the label of the label
+            if (new == labels).all():
+                break
+            labels = new
+        return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+    def adjacency_matrix(self) -> np.ndarray:
+        matrix = np.zeros((len(self.nodes), len(self.nodes)), dtype=bool)
+        matrix[self.edge_sources, self.indices] = True
+        return matrix
+
+    def all_pairs_depths(self) -> np.ndarray:
+        """Depths between every pair of slots, -1 if unreachable, by
+        propagating the frontiers of every source at once.
+
+        >>> CSRGraph.from_edges([(1, 2), (2, 3)], nodes=[4]).all_pairs_depths()
+        array([[ 0, -1, -1, -1],
+               [-1,  0,  1,  2],
+               [-1,  1,  0,  1],
+               [-1,  2,  1,  0]], dtype=int32)
+        """
+
+        adj = self.adjacency_matrix()
+        depths = np.full(adj.shape, -1, dtype=np.int32)
+        reached = np.eye(len(self.nodes), dtype=bool)
+        depths[reached] = 0
+        frontier = reached
+        depth = 0
+        while frontier.any():
+            depth += 1
+            # a row is the set of slots one step further from its source
+            frontier = (frontier @ adj) & ~reached
+            depths[frontier] = depth
+            reached |= frontier
+        return depths
+
+    def to_networkx(self):
+        import networkx as nx
+
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(self.nodes)
+        G.add_edges_from(
+            (self.nodes[a], self.nodes[b])
+            for a, b in zip(self.edge_sources, self.indices)
+        )
+        return G
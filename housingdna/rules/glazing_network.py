@@ -1,4 +1,4 @@
-from typing import List, Mapping
+from typing import List, Mapping, Sequence
 
 from ..model import (
     Direction, RevitObject,
@@ -10,28 +10,16 @@ from .name import (
     is_main,
     is_semi_outdoor, is_corridor
 )
-import networkx as nx
+from .light import SUN_DIRECTIONS, light_index, relation_arrays
+from .zone import OpenZones, open_zones
 
 
 def dnas_glazing_network(
     model: House,
 ) -> List[N]:
     # room-glazing network
-    G: nx.DiGraph = nx.DiGraph()
-    # assuming mid-latitude northern hemisphere
-    sun_directions = [Direction.SOUTH,
-                      Direction.SOUTHEAST, Direction.SOUTHWEST]
+    sun_directions = SUN_DIRECTIONS
     opposite_directions = [d.opposite() for d in sun_directions]
-    edges = [
-        (rel.room_id, rel.glazing_id)
-        for rel in model.room_glazing_relations
-        if any((facing in sun_directions) for facing in rel.facings)
-    ] + [
-        (rel.glazing_id, rel.room_id)
-        for rel in model.room_glazing_relations
-        if any((facing in opposite_directions) for facing in rel.facings)
-    ]
-    G.add_edges_from(edges)
 
     main_list = [room.element_id for room in model.rooms if is_main(room)]
     bed_list = [room.element_id for room in model.rooms if is_bedroom(room)]
@@ -41,26 +29,20 @@ def dnas_glazing_network(
         if is_ancillary(room) and not is_semi_outdoor(room)
     ]
 
-    outmost_list = [g.element_id for g in model.glazings if g.outmost]
-
-    sun_dict = {
-        room.element_id: analyze_sun_order(G, outmost_list, room.element_id)
-        for room in model.rooms
-    }
+    sun_dict = light_index(model).sun_orders(
+        sun_directions, [room.element_id for room in model.rooms])
     sunlit_order: int = 3
 
     # dna40_northface를 위한 코드
-    south = [(rel.room_id) for rel in model.room_glazing_relations if rel.room_id in main_list and any(
-        (facing in sun_directions) for facing in rel.facings)]
-    north = [(rel.room_id) for rel in model.room_glazing_relations if rel.room_id in indoor_ancill_list and any(
-        (facing in opposite_directions) for facing in rel.facings)] + [room for room in indoor_ancill_list if sun_dict[room] > sunlit_order]
+    rels = relation_arrays(model)
+    room_ids = rels.room_ids.tolist()
+    south = [room for room, facing in zip(room_ids, rels.facing_any(sun_directions).tolist())
+             if facing and room in main_list]
+    north = [room for room, facing in zip(room_ids, rels.facing_any(opposite_directions).tolist())
+             if facing and room in indoor_ancill_list] + [room for room in indoor_ancill_list if sun_dict[room] > sunlit_order]
 
     # dna39_Light_dark_contrast를 위한 코드
-    conn_types_open = [RevitObject.ROOM_SEPARATION_LINE]
-    list_conn_values1 = [
-        sun_dict[conn.a_id] for conn in model.room_connections if conn.type_ in conn_types_open]
-    list_conn_values2 = [
-        sun_dict[conn.b_id] for conn in model.room_connections if conn.type_ in conn_types_open]
+    zones = open_zones(model)
 
     dna: List[N] = []
     for key, eval in [
@@ -78,7 +60,7 @@ def dnas_glazing_network(
         ),
         (
             "dna39",
-            dna39_Light_dark_contrast(list_conn_values1, list_conn_values2),
+            dna39_Light_dark_contrast(zones, sun_dict),
         ),
         ("dna43", dna43_fun_corr(model)),
     ]:
@@ -95,25 +77,12 @@ def dnas_glazing_network(
 
 
 def analyze_sun_order(
-    sun_graph: nx.DiGraph,
-    outmost_list: List[int],
+    model: House,
     room_id: int,
+    sun_directions: Sequence[Direction] = SUN_DIRECTIONS,
     max_order: int = 9,  # 9 steps from outdoor is as dark as it gets
 ) -> int:
-    min_order = max_order
-    for glazing in outmost_list:
-        try:
-            n: int = nx.shortest_path_length(
-                sun_graph, room_id, glazing)  # type: ignore
-            if n < min_order:
-                min_order = n
-        except nx.NodeNotFound:
-            # 창이 없어서 방 노드가 안 만들어진 경우
-            pass
-        except nx.NetworkXNoPath:
-            # 여기는 경로가 없는 경우
-            pass
-    return min_order
+    return light_index(model, max_order).sun_orders(sun_directions, [room_id])[room_id]
 
 
 def dna37_indoor_for_sunlight(
@@ -162,19 +131,18 @@ def dna40_northface(sun_dict: Mapping[int, int],
 # DONE: dna39_Light_dark_contrast: 성공!!
 
 
-def dna39_Light_dark_contrast(list_conn_values1: List[int],
-                              list_conn_values2: List[int],
-                              ) -> List[int]:
-    if list_conn_values1 != list_conn_values2:  # 오픈으로 연결된 방들의 채광정도의 차이가 있는 경우, True
-        return True
-    return False
+def dna39_Light_dark_contrast(zones: OpenZones,
+                              sun_dict: Mapping[int, int],
+                              ) -> bool:
+    # 오픈으로 연결된 방들의 채광정도의 차이가 있는 경우, True
+    return bool((zones.zone_min(sun_dict) != zones.zone_max(sun_dict)).any())
 
 
 def dna43_fun_corr(
     model: House,
 ) -> List[N]:
     # room-glazing network
-    conn_types_open = [RevitObject.ROOM_SEPARATION_LINE]
+    zones = open_zones(model)
     conn_types_win = [RevitObject.WINDOW, RevitObject.CURTAIN_WALL]
     glazing_types = [(gla.element_id)
                      for gla in model.glazings if gla.type_ in conn_types_win]
@@ -192,8 +160,7 @@ def dna43_fun_corr(
     fun_corr1 = [room for room in corr_list]
     # 2. 복도가 있을 때, 복도와 연결된 다른 공간이 오픈되어 있는 경우. but 현관과 복도 오픈 연결은 제외
     fun_corr2 = [
-        (conn.a_id, conn.type_) for conn in model.room_connections if conn.a_id in corr_list and conn.type_ in conn_types_open and not ancill_list] + [
-        (conn.b_id, conn.type_) for conn in model.room_connections if conn.b_id in corr_list and conn.type_ in conn_types_open and not ancill_list]
+        room for room in corr_list if zones.open_neighbors(room) and not ancill_list]
     # 3. 복도가 있을 때, 복도에 외기로의 창이 있는 경우. 외기에 면한 창만을 어떻게 설정????
     fun_corr3 = [rel for rel in outmost_room if rel in corr_list]
 
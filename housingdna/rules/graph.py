@@ -0,0 +1,182 @@
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from .csr import SMALL_GRAPH, CSRGraph
+
+# use networkx algorithms instead of the CSR kernels, to verify the results
+USE_NETWORKX: bool = False
+
+
+def multi_source_depths(
+    graph: CSRGraph,
+    sources: Iterable[int],
+    cutoff: Optional[int] = None,
+) -> Dict[int, int]:
+    """Depths of nodes from the nearest of the sources, in one breadth-first pass.
+
+    >>> g = CSRGraph.from_edges([(1, 2), (2, 3)], nodes=[4])
+    >>> multi_source_depths(g, [1])
+    {1: 0, 2: 1, 3: 2}
+
+    Each node gets the depth from its closest source.
+    >>> multi_source_depths(g, [1, 3])
+    {1: 0, 2: 1, 3: 0}
+
+    Sources that are not in the graph are ignored, like unreachable nodes.
+    >>> multi_source_depths(g, [5])
+    {}
+
+    The search stops at the cutoff depth.
+    >>> multi_source_depths(g, [1], cutoff=1)
+    {1: 0, 2: 1}
+    """
+
+    if USE_NETWORKX:
+        import networkx as nx
+
+        G = graph.to_networkx()
+        sources = [source for source in sources if source in G]
+        if not sources:
+            return {}
+        return dict(
+            nx.multi_source_dijkstra_path_length(G, set(sources), cutoff=cutoff)
+        )
+
+    if len(graph) <= SMALL_GRAPH:
+        index = graph.index
+        walked = graph.walk((index[s] for s in sources if s in index), cutoff)
+        return {graph.nodes[i]: depth for i, depth in sorted(walked.items())}
+
+    depths = graph.bfs(graph.slots(sources), cutoff)
+    return {graph.nodes[i]: int(depths[i]) for i in np.flatnonzero(depths >= 0)}
+
+
+def all_pairs_depths(graph: CSRGraph) -> Tuple[List[int], np.ndarray]:
+    """Depths between every pair of nodes.
+
+    Returns the nodes of the graph, and a square matrix of depths in that
+    order. Unreachable pairs have the depth of -1.
+
+    >>> g = CSRGraph.from_edges([(1, 2), (2, 3)], nodes=[4])
+    >>> nodes, depths = all_pairs_depths(g)
+    >>> nodes
+    [4, 1, 2, 3]
+    >>> depths[1]
+    array([-1,  0,  1,  2], dtype=int32)
+    """
+
+    if USE_NETWORKX:
+        import networkx as nx
+
+        depths = np.full((len(graph), len(graph)), -1, dtype=np.int32)
+        for source, lengths in nx.all_pairs_shortest_path_length(graph.to_networkx()):
+            for target, length in lengths.items():
+                depths[graph.index[source], graph.index[target]] = length
+        return graph.nodes, depths
+
+    return graph.nodes, graph.all_pairs_depths()
+
+
+def closeness_from_depths(depths: np.ndarray) -> np.ndarray:
+    """Closeness centralities from a depth matrix, -1 for unreachable pairs."""
+    size = len(depths)
+    n_reach = (depths >= 0).sum(axis=1) - 1.0  # without itself
+    total = np.where(depths > 0, depths, 0).sum(axis=1)
+
+    closeness = np.zeros(size)
+    mask = total > 0
+    if size > 1:
+        closeness[mask] = n_reach[mask] / total[mask]
+        closeness[mask] *= n_reach[mask] / (size - 1)
+    return closeness
+
+
+class UnionFind:
+    """Disjoint sets of nodes, merged together by pairs of connected nodes.
+
+    >>> sets = UnionFind([1, 2, 3, 4])
+    >>> sets.union(1, 2)
+    >>> sets.union(2, 3)
+    >>> sets.find(3) == sets.find(1)
+    True
+    >>> len(sets)
+    2
+    >>> sorted(sorted(group) for group in sets.groups())
+    [[1, 2, 3], [4]]
+
+    A pair with a node that was not given will add that node.
+    >>> sets.union(4, 5)
+    >>> len(sets)
+    2
+    """
+
+    def __init__(self, nodes: Iterable[int] = ()):
+        self.parents: Dict[int, int] = {node: node for node in nodes}
+        self.n_sets: int = len(self.parents)
+
+    def find(self, node: int) -> int:
+        parents = self.parents
+        if node not in parents:
+            parents[node] = node
+            self.n_sets += 1
+            return node
+        while (parent := parents[node]) != node:
+            # path halving
+            parents[node] = parents[parent]
+            node = parents[node]
+        return node
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parents[root_b] = root_a
+            self.n_sets -= 1
+
+    def __len__(self) -> int:
+        return self.n_sets
+
+    def groups(self) -> List[Set[int]]:
+        groups: Dict[int, Set[int]] = {}
+        for node in self.parents:
+            groups.setdefault(self.find(node), set()).add(node)
+        return list(groups.values())
+
+
+def count_components_without(
+    nodes: Iterable[int],
+    pairs: Iterable[Tuple[int, int]],
+    excluded: Collection[int] = (),
+) -> int:
+    """Number of connected components, as if the excluded nodes were removed.
+
+    No graph is built nor copied; pairs touching an excluded node are skipped,
+    though their other node still counts, as it would in a graph.
+
+    >>> pairs = [(1, 2), (2, 3), (3, 4)]
+    >>> count_components_without([1, 2, 3, 4], pairs)
+    1
+    >>> count_components_without([1, 2, 3, 4], pairs, excluded=[2])
+    2
+    >>> count_components_without([1, 2], pairs, excluded=[1, 2, 3, 4])
+    0
+    """
+
+    excluded = set(excluded)
+    sets = UnionFind(node for node in nodes if node not in excluded)
+    for a, b in pairs:
+        if a not in excluded and b not in excluded:
+            sets.union(a, b)
+        elif a not in excluded:
+            sets.find(a)
+        elif b not in excluded:
+            sets.find(b)
+    return len(sets)
@@ -0,0 +1,314 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..model import Direction, House
+from . import graph
+from .cache import house_cache
+from .csr import CSRGraph
+from .graph import multi_source_depths
+
+# assuming mid-latitude northern hemisphere
+SUN_DIRECTIONS = (Direction.SOUTH, Direction.SOUTHEAST, Direction.SOUTHWEST)
+# including the morning and the evening sun
+WIDE_SUN_DIRECTIONS = SUN_DIRECTIONS + (Direction.EAST, Direction.WEST)
+
+ORIENTATIONS = tuple(Direction(value) for value in range(1, 9))
+
+_WORD_BITS = 64
+
+
+def direction_mask(directions: Iterable[Direction]) -> int:
+    """Bit mask of directions, one bit for each direction.
+
+    >>> bin(direction_mask([Direction.NORTH, Direction.SOUTH]))
+    '0b100010'
+    >>> bin(direction_mask([Direction.UP, Direction.DOWN]))
+    '0b11000000000'
+    """
+    mask = 0
+    for d in directions:
+        if d is Direction.UP:
+            mask |= 1 << 9
+        elif d is Direction.DOWN:
+            mask |= 1 << 10
+        else:
+            mask |= 1 << d.value
+    return mask
+
+
+def orientation_class(direction: Direction) -> Tuple[Direction, ...]:
+    """A horizontal direction with its two neighboring directions.
+
+    >>> orientation_class(Direction.SOUTH) == SUN_DIRECTIONS
+    True
+    >>> orientation_class(Direction.NORTH)
+    (<Direction.NORTH: 1>, <Direction.NORTHWEST: 8>, <Direction.NORTHEAST: 2>)
+    """
+    value = direction.value
+    return (direction, Direction((value - 2) % 8 + 1), Direction(value % 8 + 1))
+
+
+@dataclass(frozen=True)
+class RelationArrays:
+    """Room-glazing relations of a house, as arrays of the same length."""
+
+    room_ids: np.ndarray
+    glazing_ids: np.ndarray
+    # direction_mask of the facings
+    facing_masks: np.ndarray
+
+    def facing_any(self, directions: Iterable[Direction]) -> np.ndarray:
+        """Whether each relation faces any of the directions."""
+        return (self.facing_masks & direction_mask(directions)) != 0
+
+    def sun_edges(self, sun_directions: Iterable[Direction]) -> np.ndarray:
+        """Id pairs of the edges towards the sun.
+
+        An edge goes from a room to a glazing on its sunny side,
+        and from a glazing to a room on its sunny side.
+        """
+        sun_directions = list(sun_directions)
+        # which way each relation leads to the sun, in one pass over the masks
+        towards_sun = (
+            self.facing_masks[:, np.newaxis]
+            & np.array(
+                [
+                    direction_mask(sun_directions),
+                    direction_mask(d.opposite() for d in sun_directions),
+                ]
+            )
+        ) != 0
+        return np.concatenate(
+            [
+                np.stack([self.room_ids, self.glazing_ids], axis=1)[towards_sun[:, 0]],
+                np.stack([self.glazing_ids, self.room_ids], axis=1)[towards_sun[:, 1]],
+            ]
+        )
+
+
+@house_cache
+def relation_arrays(model: House) -> RelationArrays:
+    rels = model.room_glazing_relations
+    return RelationArrays(
+        room_ids=np.array([rel.room_id for rel in rels], dtype=np.int64),
+        glazing_ids=np.array([rel.glazing_id for rel in rels], dtype=np.int64),
+        facing_masks=np.array(
+            [direction_mask(rel.facings) for rel in rels], dtype=np.int64
+        ),
+    )
+
+
+class LightIndex:
+    """Which outmost glazings light up each node, and within how many hops.
+
+    Light comes in through an outmost glazing and goes away from the sun,
+    one room or glazing per hop, against the edges of the sun graph.
+    Each set of sun directions gets its own graph of the light when it is
+    first asked for, which is kept for the next time.
+    Sun orders come from one search of that graph from every outmost glazing.
+    Which glazing reaches which node is kept in bitsets: `reach(directions)[k]`
+    has a row per node, with the bit j set if the light of the j-th outmost
+    glazing reaches the node within k hops.
+
+    >>> # outmost glazing 10 on the south of room 1,
+    >>> # and glazing 20 between room 1 and room 2 on its north
+    >>> south = direction_mask([Direction.SOUTH])
+    >>> north = direction_mask([Direction.NORTH])
+    >>> rels = RelationArrays(
+    ...     room_ids=np.array([1, 1, 2]),
+    ...     glazing_ids=np.array([10, 20, 20]),
+    ...     facing_masks=np.array([south, north, south]),
+    ... )
+    >>> index = LightIndex(rels, [10], [1, 2])
+    >>> index.sun_orders(SUN_DIRECTIONS, [1, 2, 20])
+    {1: 1, 2: 3, 20: 2}
+    >>> index.lit_within(SUN_DIRECTIONS, 2)
+    array([ True,  True,  True, False])
+    >>> index.nodes
+    [10, 20, 1, 2]
+    >>> index.hops(SUN_DIRECTIONS)[:, 0]
+    array([0, 2, 1, 3])
+    >>> index.glazings_within(SUN_DIRECTIONS, 2, k=2)
+    []
+
+    No light comes from the north.
+    >>> index.sun_orders([Direction.NORTH], [1, 2])
+    {1: 9, 2: 9}
+    >>> len(index.direction_sets)
+    2
+
+    With networkx instead of the CSR kernels, the results are the same.
+    >>> graph.USE_NETWORKX = True
+    >>> index = LightIndex(rels, [10], [1, 2])
+    >>> index.sun_orders(SUN_DIRECTIONS, [1, 2, 20]), index.hops(SUN_DIRECTIONS)[:, 0]
+    ({1: 1, 2: 3, 20: 2}, array([0, 2, 1, 3]))
+    >>> graph.USE_NETWORKX = False
+    """
+
+    def __init__(
+        self,
+        rels: RelationArrays,
+        glazings: Sequence[int],
+        nodes: Iterable[int] = (),
+        max_order: int = 9,  # 9 steps from outdoor is as dark as it gets
+    ):
+        self.rels = rels
+        self.glazings: List[int] = list(glazings)
+        self.max_order = max_order
+
+        index: Dict[int, int] = {}
+        for node in [*self.glazings, *rels.glazing_ids.tolist(), *nodes]:
+            index.setdefault(node, len(index))
+        for node in rels.room_ids.tolist():
+            index.setdefault(node, len(index))
+        self.index = index
+        self.nodes: List[int] = list(index)
+        # slots of the nodes in id order, to look up many ids at once
+        ids = np.array(self.nodes, dtype=np.int64)
+        self._by_id = np.argsort(ids)
+        self._sorted_ids = ids[self._by_id]
+
+        # graphs and outmost glazings on them, of the sets asked for so far
+        self._graphs: Dict[FrozenSet[Direction], Tuple[CSRGraph, List[int]]] = {}
+        self._depths: Dict[FrozenSet[Direction], Dict[int, int]] = {}
+        self._reach: Dict[FrozenSet[Direction], np.ndarray] = {}
+
+    @property
+    def direction_sets(self) -> List[FrozenSet[Direction]]:
+        return list(self._graphs)
+
+    def light_graph(
+        self, directions: Iterable[Direction]
+    ) -> Tuple[CSRGraph, List[int]]:
+        """Directed graph of the way light goes, and the outmost glazings
+        on it (glazings without an edge are not on the sun graph at all)."""
+        directions = frozenset(directions)
+        if directions not in self._graphs:
+            # light goes against the edges towards the sun
+            edges = self.rels.sun_edges(directions)[:, ::-1]
+            slots = self._by_id[np.searchsorted(self._sorted_ids, edges)]
+            on_graph = np.zeros(len(self.nodes), dtype=bool)
+            on_graph[slots.ravel()] = True
+            self._graphs[directions] = (
+                CSRGraph.from_slot_pairs(
+                    self.nodes, slots.astype(np.int32), directed=True
+                ),
+                [g for g in self.glazings if on_graph[self.index[g]]],
+            )
+        return self._graphs[directions]
+
+    def depths(self, directions: Iterable[Direction]) -> Dict[int, int]:
+        """Hops from the closest outmost glazing to the nodes its light
+        reaches within max_order."""
+        directions = frozenset(directions)
+        if directions not in self._depths:
+            light, sources = self.light_graph(directions)
+            self._depths[directions] = multi_source_depths(
+                light, sources, cutoff=self.max_order
+            )
+        return self._depths[directions]
+
+    def reach(self, directions: Iterable[Direction]) -> np.ndarray:
+        directions = frozenset(directions)
+        if directions not in self._reach:
+            self._reach[directions] = self._propagate(directions)
+        return self._reach[directions]
+
+    def _propagate(self, directions: FrozenSet[Direction]) -> np.ndarray:
+        light, sources = self.light_graph(directions)
+        n_words = max(1, -(-len(self.glazings) // _WORD_BITS))
+
+        seed = np.zeros((len(self.nodes), n_words), dtype=np.uint64)
+        for j, glazing in enumerate(self.glazings):
+            if glazing in sources:
+                seed[self.index[glazing], j // _WORD_BITS] |= np.uint64(
+                    1 << (j % _WORD_BITS)
+                )
+
+        reach = np.zeros((self.max_order + 1, *seed.shape), dtype=np.uint64)
+        reach[0] = seed
+        for k in range(1, self.max_order + 1):
+            # a node is lit by the nodes its light comes from
+            reach[k] = reach[k - 1]
+            np.bitwise_or.at(reach[k], light.indices, reach[k - 1][light.edge_sources])
+            if (reach[k] == reach[k - 1]).all():
+                reach[k + 1 :] = reach[k]
+                break
+        return reach
+
+    def lit_within(self, directions: Iterable[Direction], k: int) -> np.ndarray:
+        """Whether each node gets any light within k hops."""
+        depths = self.depths(directions)
+        return np.array([depths.get(node, k + 1) <= k for node in self.nodes])
+
+    def orders(self, directions: Iterable[Direction]) -> np.ndarray:
+        """Hops from the closest outmost glazing to each node, at most max_order."""
+        depths = self.depths(directions)
+        return np.array([depths.get(node, self.max_order) for node in self.nodes])
+
+    def sun_orders(
+        self, directions: Iterable[Direction], nodes: Iterable[int]
+    ) -> Dict[int, int]:
+        """Steps from each node to the closest outmost glazing, against the
+        edges towards the sun; nodes the light doesn't reach get max_order."""
+        depths = self.depths(directions)
+        return {node: depths.get(node, self.max_order) for node in nodes}
+
+    def hops(self, directions: Iterable[Direction]) -> np.ndarray:
+        """Hops from each outmost glazing (columns) to each node (rows),
+        -1 if its light doesn't reach the node within max_order."""
+        if graph.USE_NETWORKX:
+            light, sources = self.light_graph(directions)
+            hops = np.full((len(self.nodes), len(self.glazings)), -1)
+            for j, glazing in enumerate(self.glazings):
+                if glazing in sources:
+                    depths = multi_source_depths(light, [glazing], self.max_order)
+                    for node, depth in depths.items():
+                        hops[self.index[node], j] = depth
+            return hops
+
+        words = self.reach(directions)
+        bits = np.unpackbits(
+            words.astype("<u8").view(np.uint8), axis=-1, bitorder="little"
+        )[..., : len(self.glazings)].astype(bool)
+        return np.where(bits[-1], bits.argmax(axis=0), -1)
+
+    def glazings_within(
+        self, directions: Iterable[Direction], node: int, k: Optional[int] = None
+    ) -> List[int]:
+        """Outmost glazings whose light reaches the node within k hops."""
+        hops = self.hops(directions)[self.index[node]]
+        k = self.max_order if k is None else k
+        return [g for g, h in zip(self.glazings, hops) if 0 <= h <= k]
+
+
+@house_cache
+def light_index(model: House, max_order: int = 9) -> LightIndex:
+    """Light index of the rooms and glazings of a house, shared by the rules
+    that look at the light from any set of directions.
+
+    Equal houses may still differ in their facings (or outmost glazings),
+    so each house gets its own index.
+    >>> from ..model import Glazing, Length, RevitObject, Room, RoomGlazingRelation
+    >>> def house(facing: Direction) -> House:
+    ...     return House(
+    ...         rooms=(Room(1, "거실", Length.from_ft(9)),),
+    ...         glazings=(Glazing(10, RevitObject.WINDOW, outmost=True),),
+    ...         room_glazing_relations=(RoomGlazingRelation(1, 10, (facing,)),),
+    ...     )
+    >>> south, north = house(Direction.SOUTH), house(Direction.NORTH)
+    >>> south == north
+    True
+    >>> light_index(south).sun_orders(SUN_DIRECTIONS, [1])
+    {1: 1}
+    >>> light_index(north).sun_orders(SUN_DIRECTIONS, [1])
+    {1: 9}
+    """
+    return LightIndex(
+        relation_arrays(model),
+        [g.element_id for g in model.glazings if g.outmost],
+        [*(g.element_id for g in model.glazings), *(r.element_id for r in model.rooms)],
+        max_order,
+    )
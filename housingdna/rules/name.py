@@ -244,6 +244,28 @@ def is_exemption(room: Room) -> bool:
     return judge_by_name(room.name, partial_list=partial_list)
 
 
+# 여러 세대가 함께 쓰는 공용 공간 (세대에 속하지 않는 방)의 후보
+# 한 세대에만 면한 후보(복층 세대의 계단 등)는 extension.shared_rooms에서 그 세대로 간다
+def is_common(room: Room) -> bool:
+    exact_list = ["ev", "elev", "core", "코어"]
+    partial_list = [
+        "공용",
+        "계단",
+        "승강기",
+        "엘리베이터",
+        "로비",
+        "stair",
+        "elevator",
+        "lobby",
+        "common",
+        "shared",
+    ]
+    exclude_partial = ["현관"]
+    return judge_by_name(
+        room.name, exact_list, partial_list, exclude_partial=exclude_partial
+    )
+
+
 def dna33_main_entrance(ent_list: List[int]) -> List[int]:
     # TODO: better handling for houses with no entrance room
     return ent_list
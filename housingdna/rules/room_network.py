@@ -1,22 +1,25 @@
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 
 from ..model import House
 from .type import N
 from .name import is_ancillary, is_bedroom, is_entrance, is_corridor, is_public
 from .attribute import is_mbr
-import networkx as nx
+from .cache import house_cache
+from .csr import CSRGraph
+from .graph import all_pairs_depths, closeness_from_depths, count_components_without
 
 
 def dnas_room_network(
     model: House,
 ) -> List[N]:
     # room network
-    G: nx.Graph = nx.Graph()
-    G.add_nodes_from(room.element_id for room in model.rooms)
-    G.add_edges_from((conn.a_id, conn.b_id) for conn in model.room_connections)
+    depths = room_depths(model)
+    G = depths.graph
 
     rooms = [room.element_id for room in model.rooms]
+    pairs = [(conn.a_id, conn.b_id) for conn in model.room_connections]
     pub_list = [room.element_id for room in model.rooms if is_public(room)]
     bed_list = [room.element_id for room in model.rooms if is_bedroom(room)]
     mbr_list = [room.element_id for room in model.rooms if is_mbr(room)]
@@ -27,9 +30,9 @@ def dnas_room_network(
 
     dna: List[N] = []
     for key, eval in [
-        ("dna36", dna36_pub_priv_gradient(G, pub_list, bed_list, ent_list)),
-        ("dna38", dna38_direct_connection(G, corr_list)),
-        ("dna41", dna41_central_public(G, rooms, pub_list)),
+        ("dna36", dna36_pub_priv_gradient(depths, pub_list, bed_list, ent_list)),
+        ("dna38", dna38_direct_connection(rooms, pairs, corr_list)),
+        ("dna41", dna41_central_public(depths, rooms, pub_list)),
         ("dna44", dna44_couples_realm(G, mbr_list, ancill_list)),
         ("dna45", dna45_childrens_realm(G, bed_list, mbr_list, ancill_list)),
         ("dna56", dna56_marriage_bed(G, mbr_list, ancill_list)),
@@ -47,22 +50,110 @@ def dnas_room_network(
     return dna
 
 
+def room_graph(model: House) -> CSRGraph:
+    return CSRGraph.from_edges(
+        ((conn.a_id, conn.b_id) for conn in model.room_connections),
+        nodes=(room.element_id for room in model.rooms),
+    )
+
+
+class RoomDepths:
+    """Depths between every pair of rooms of a house.
+
+    Depths are kept in a small int matrix indexed by the slots of the rooms
+    in the room graph, -1 for rooms that can't reach each other.
+
+    >>> from ..model import RevitObject, RoomConnection
+    >>> door = RevitObject.DOOR
+    >>> house = House(room_connections=(
+    ...     RoomConnection(1, 2, door), RoomConnection(2, 3, door)
+    ... ))
+    >>> depths = room_depths(house)
+    >>> depths.depth(1, 3), depths.adjacent(1, 2), depths.adjacent(1, 3)
+    (2, True, False)
+    >>> depths.any_adjacent([1], [3, 2])
+    True
+    >>> depths.depth_map([1, 3], [1, 2, 4])
+    {1: 0, 2: 1, 4: None}
+
+    Depths of a house are computed once and reused.
+    >>> room_depths(house) is depths
+    True
+    """
+
+    def __init__(self, graph: CSRGraph):
+        self.graph = graph
+        self.index = graph.index
+        nodes, depths = all_pairs_depths(graph)
+        self.nodes: List[int] = nodes
+        dtype = np.int8 if depths.max(initial=0) <= np.iinfo(np.int8).max else np.int16
+        self.depths: np.ndarray = depths.astype(dtype)
+
+    def depth(self, a: int, b: int) -> Optional[int]:
+        depth = int(self.depths[self.index[a], self.index[b]])
+        return depth if depth >= 0 else None
+
+    def adjacent(self, a: int, b: int) -> bool:
+        return bool(self.depths[self.index[a], self.index[b]] == 1)
+
+    def any_adjacent(self, a_list: Iterable[int], b_list: Iterable[int]) -> bool:
+        # a few rooms at a time, so their neighbors are walked in plain Python
+        cols = {i for b in b_list if (i := self.index.get(b)) is not None}
+        adjacency = self.graph.adjacency
+        return any(
+            j in cols
+            for a in a_list
+            if (i := self.index.get(a)) is not None
+            for j in adjacency[i]
+            if j != i
+        )
+
+    def depth_map(
+        self, sources: Iterable[int], nodes: Iterable[int]
+    ) -> Dict[int, Optional[int]]:
+        """Depths of the nodes from the nearest of the sources, None if
+        they can't be reached from any source."""
+        rows = self.depths[self.graph.slots(sources)].astype(np.int32)
+        # unreachable depths are pushed beyond any real depth
+        rows[rows < 0] = len(self.nodes)
+        nearest = rows.min(axis=0, initial=len(self.nodes))
+        return {
+            node: int(depth)
+            if (i := self.index.get(node)) is not None
+            and (depth := nearest[i]) < len(self.nodes)
+            else None
+            for node in nodes
+        }
+
+    def closeness(self) -> Dict[int, float]:
+        closeness = closeness_from_depths(self.depths)
+        return {node: float(c) for node, c in zip(self.nodes, closeness)}
+
+
+@house_cache
+def room_depths(model: House) -> RoomDepths:
+    return RoomDepths(room_graph(model))
+
+
 def dna36_pub_priv_gradient(
-    G: nx.Graph, pub_list: List[int], bed_list: List[int], ent_list: List[int]
+    depths: RoomDepths, pub_list: List[int], bed_list: List[int], ent_list: List[int]
 ) -> Optional[List[int]]:
     # TODO: support for gray edges
 
-    try:
-        # TODO: better handling for houses with multiple entrances
-        ent_room = ent_list[0]
-    except:
+    if not ent_list:
         # TODO: better handling for houses with no entrance room???
         return None
 
-    pub_PDs: List[int] = [nx.shortest_path_length(
-        G, ent_room, room) for room in pub_list]  # type: ignore
-    bed_PDs: List[int] = [nx.shortest_path_length(
-        G, ent_room, room) for room in bed_list]  # type: ignore
+    # depths from the closest entrance, None for rooms that can't be reached
+    ent_depths = depths.depth_map(ent_list, pub_list + bed_list)
+    pub_PDs: List[int] = [
+        depth for room in pub_list if (depth := ent_depths[room]) is not None
+    ]
+    bed_PDs: List[int] = [
+        depth for room in bed_list if (depth := ent_depths[room]) is not None
+    ]
+    if not pub_PDs or not bed_PDs:
+        return None
 
     if min(pub_PDs) < max(bed_PDs):
         return pub_list + bed_list
@@ -70,31 +161,28 @@ def dna36_pub_priv_gradient(
         return []
 
 
-def dna38_direct_connection(G_orig: nx.Graph, corr_list: List[int]) -> bool:
-    G: nx.Graph = G_orig.copy()
-    G.remove_nodes_from(corr_list)
-
-    n_components: int = nx.number_connected_components(G)
+def dna38_direct_connection(
+    rooms: List[int], pairs: List[Tuple[int, int]], corr_list: List[int]
+) -> bool:
+    # rooms are still connected to each other without corridors
+    n_components: int = count_components_without(rooms, pairs, corr_list)
     # TODO: 그레이에 대한 고려 필요. 예) dna38과 그레이로 연결되는 63_생활공간의 일부인 계단을 어떻게.....
     return True if n_components == 1 else False
 
 
 def dna41_central_public(
-    G: nx.Graph, rooms: List[int], pub_list: List[int]
+    depths: RoomDepths, rooms: List[int], pub_list: List[int]
 ) -> List[int]:
-    pub_clo: List[Tuple[int, float]] = [  # type: ignore
-        (room, nx.closeness_centrality(G, room)) for room in pub_list
-    ]
+    closeness = depths.closeness()
+    pub_clo: List[Tuple[int, float]] = [(room, closeness[room]) for room in pub_list]
     max_other_clo: float = max(
-        [
-            nx.closeness_centrality(G, room) for room in rooms if room not in pub_list
-        ]  # type: ignore
+        [closeness[room] for room in rooms if room not in pub_list]
     )
     return [room for room, clo in pub_clo if clo > max_other_clo]
 
 
 def dna44_couples_realm(
-    G: nx.Graph,
+    G: CSRGraph,
     mbr_list: List[int],
     ancill_list: List[int],
 ) -> List[int]:
@@ -104,7 +192,7 @@ def dna44_couples_realm(
 
 
 def dna45_childrens_realm(
-    G: nx.Graph,
+    G: CSRGraph,
     bed_list: List[int],
     mbr_list: List[int],
     ancill_list: List[int],
@@ -115,7 +203,7 @@ def dna45_childrens_realm(
 
 
 def dna56_marriage_bed(
-    G: nx.Graph,
+    G: CSRGraph,
     mbr_list: List[int],
     ancill_list: List[int],
 ) -> List[int]:
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..model import House
+from .csr import CSRGraph
+from .graph import all_pairs_depths
+from .name import is_entrance
+from .room_network import room_depths
+
+
+@dataclass
+class SpaceSyntax:
+    """Justified graph metrics of the rooms of a house.
+
+    Every array is in the order of the nodes. A metric that is undefined for
+    a room (for example, the mean depth of a room with no neighbor) is nan.
+    Metrics of a disconnected house are taken within the part of each room.
+    """
+
+    nodes: List[int]
+    total_depth: np.ndarray
+    mean_depth: np.ndarray
+    # relative asymmetry: mean depth scaled to 0 (shallowest) ~ 1 (deepest)
+    relative_asymmetry: np.ndarray
+    # real relative asymmetry: relative asymmetry relative to a diamond graph
+    real_relative_asymmetry: np.ndarray
+    # Hillier & Hanson's integration, 1 / real relative asymmetry
+    integration: np.ndarray
+    control: np.ndarray
+    # choice, in the number of shortest paths between other rooms
+    choice: np.ndarray
+    # depth from the closest entrance, -1 if it can't be reached
+    entrance_depth: np.ndarray
+
+    def as_dict(self, metric: str) -> Dict[int, float]:
+        return {
+            node: float(value) for node, value in zip(self.nodes, getattr(self, metric))
+        }
+
+
+def space_syntax(model: House) -> SpaceSyntax:
+    # the depths of the rooms are shared with the room network rules
+    depths = room_depths(model)
+    entrances = [room.element_id for room in model.rooms if is_entrance(room)]
+    return space_syntax_of_graph(
+        depths.graph, depths.graph.slots(entrances), depths.depths
+    )
+
+
+def space_syntax_of_graph(
+    graph: CSRGraph, entrances: np.ndarray, depths: Optional[np.ndarray] = None
+) -> SpaceSyntax:
+    """Space syntax metrics of every node, from one all-pairs depth matrix,
+    which is computed unless given.
+
+    >>> # a corridor (2) with two rooms (1, 3), and a room (4) behind one of them
+    >>> g = CSRGraph.from_edges([(1, 2), (2, 3), (3, 4)])
+    >>> s = space_syntax_of_graph(g, g.slots([1]))
+    >>> s.total_depth
+    array([6, 4, 4, 6])
+    >>> s.mean_depth
+    array([2.        , 1.33333333, 1.33333333, 2.        ])
+    >>> s.relative_asymmetry
+    array([1.        , 0.33333333, 0.33333333, 1.        ])
+    >>> s.control
+    array([0.5, 1.5, 1.5, 0.5])
+    >>> s.choice
+    array([0., 2., 2., 0.])
+    >>> s.entrance_depth
+    array([0, 1, 2, 3], dtype=int32)
+
+    A room next to every other room has no real relative asymmetry, and no
+    integration either.
+    >>> star = CSRGraph.from_edges([(1, 2), (1, 3), (1, 4)])
+    >>> space_syntax_of_graph(star, star.slots([])).integration
+    array([nan, 0.5, 0.5, 0.5])
+    """
+
+    nodes = graph.nodes
+    if depths is None:
+        _, depths = all_pairs_depths(graph)
+    # wide enough to add up depths
+    depths = depths.astype(np.int32)
+    reachable = depths >= 0
+    size = len(nodes)
+
+    # nodes in the same part, including itself
+    k = reachable.sum(axis=1)
+    total_depth = np.where(reachable, depths, 0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_depth = np.where(k > 1, total_depth / (k - 1), np.nan)
+        relative_asymmetry = np.where(k > 2, 2 * (mean_depth - 1) / (k - 2), np.nan)
+        # depth value of a diamond-shaped graph with k nodes
+        diamond = np.where(
+            k > 2,
+            2 * (k * (np.log2((k + 2) / 3) - 1) + 1) / ((k - 1) * (k - 2)),
+            np.nan,
+        )
+        real_relative_asymmetry = relative_asymmetry / diamond
+        integration = np.where(
+            real_relative_asymmetry > 0, 1 / real_relative_asymmetry, np.nan
+        )
+
+    degrees = np.diff(graph.indptr)
+    control = np.bincount(
+        graph.edge_sources,
+        weights=1 / degrees[graph.indices],
+        minlength=size,
+    )
+
+    # number of shortest paths between every pair, advancing depth by depth
+    adj = graph.adjacency_matrix().astype(float)
+    paths = np.eye(size)
+    for depth in range(1, int(depths.max(initial=0)) + 1):
+        at_depth = depths == depth
+        paths[at_depth] = ((paths * (depths == depth - 1)) @ adj)[at_depth]
+
+    # a node is on a shortest path between s and t
+    # when the depths through it add up to the depth between them,
+    # taken one source at a time to keep to a square of pairs
+    choice = np.zeros(size)
+    for source in range(size):
+        d_sv = depths[source, :, np.newaxis]
+        d_st = depths[source, np.newaxis, :]
+        through = (d_sv > 0) & (depths > 0) & (d_sv + depths == d_st)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = np.where(
+                through,
+                paths[source, :, np.newaxis] * paths / paths[source, np.newaxis, :],
+                0,
+            )
+        choice += shares.sum(axis=1)
+    # each pair is counted from both ends
+    choice /= 2
+
+    if len(entrances):
+        entrance_depths = np.where(reachable[entrances], depths[entrances], size)
+        nearest = entrance_depths.min(axis=0)
+        entrance_depth = np.where(nearest < size, nearest, -1).astype(np.int32)
+    else:
+        entrance_depth = np.full(size, -1, dtype=np.int32)
+
+    return SpaceSyntax(
+        nodes=nodes,
+        total_depth=total_depth,
+        mean_depth=mean_depth,
+        relative_asymmetry=relative_asymmetry,
+        real_relative_asymmetry=real_relative_asymmetry,
+        integration=integration,
+        control=control,
+        choice=choice,
+        entrance_depth=entrance_depth,
+    )
@@ -178,22 +178,8 @@ def dna67_Windows_overlooking_Life(
     return [rel.room_id for rel in rels if rel.glazing_id in real_inner_window_list]
 
 
-G: nx.DiGraph = nx.DiGraph()
 sun_directions = [Direction.SOUTH, Direction.EAST,
                   Direction.SOUTHEAST, Direction.SOUTHWEST]
-opposite_directions = [d.opposite() for d in sun_directions]
-edges = [
-    (rel.room_id, rel.glazing_id)
-    for rel in test_model.room_glazing_relations
-    if any((facing in sun_directions) for facing in rel.facings)
-] + [
-    (rel.glazing_id, rel.room_id)
-    for rel in test_model.room_glazing_relations
-    if any((facing in opposite_directions) for facing in rel.facings)
-]
-
-
-G.add_edges_from(edges)
 ent_list = [room.element_id for room in test_model.rooms if is_entrance(room)]
 living_list = [room.element_id for room in test_model.rooms if is_living(room)]
 
@@ -223,13 +209,13 @@ win_list = [
 
 
 sun_dict = {win.element_id: analyze_sun_order(
-    G, outmost_list, win.element_id) for win in test_model.rooms}
+    test_model, win.element_id, sun_directions) for win in test_model.rooms}
 sunlit_order: int = 2
 
 room_win_count2 = {win.room_id: win.glazing_id
                    for win in test_model.room_glazing_relations}
 sun_dict_win = {win.element_id: analyze_sun_order(
-    G, outmost_list, win.element_id) for win in test_model.glazings}
+    test_model, win.element_id, sun_directions) for win in test_model.glazings}
 
 sunlit2_list = [
     win for win in glazing_list if sun_dict_win[win] == sunlit_order]
@@ -66,7 +66,9 @@ from .room_network import (
     dna41_central_public,
     dna44_couples_realm,
     dna45_childrens_realm,
+    room_depths,
 )
+from .zone import open_zones
 from .glazing_network import (
     dnas_glazing_network,
     dna37_indoor_for_sunlight,
@@ -337,15 +339,8 @@ def dna_edge_by_room_conn(
 
     rt1, rt2 = room_type_ids_pair
 
-    conn_logic = [
-        (conn.a_id, conn.b_id)
-        for conn in model.room_connections
-        if conn.a_id in rt1 and conn.b_id in rt2
-    ] + [
-        (conn.a_id, conn.b_id)
-        for conn in model.room_connections
-        if conn.a_id in rt2 and conn.b_id in rt1
-    ]
+    # depths between rooms are computed once per house
+    conn_logic = room_depths(model).any_adjacent(rt1, rt2)
     if conn_logic:
         return [(d1, d2)]
     else:
@@ -474,33 +469,12 @@ def dna51_dna48(dnas: Sequence[N], model: House):
 def dna41_dna43(model: House):
     # 거실이 존재하고 거실과 연결되어 있는 다른 공간이 오픈되어 있는 경우
 
-    conn_types_open = [RevitObject.ROOM_SEPARATION_LINE]
-    fun_corr1 = [
-        (conn.b_id)
-        for conn in model.room_connections
-        if conn.a_id in living_list
-        and conn.type_ in conn_types_open
-        and not conn.b_id in ancill_list
-    ] + [
-        (conn.a_id)
-        for conn in model.room_connections
-        if conn.b_id in living_list
-        and conn.type_ in conn_types_open
-        and not conn.a_id in ancill_list
-    ]
-    fun_corr2 = [
-        (conn.b_id)
-        for conn in model.room_connections
-        if conn.a_id in living_list
-        and conn.type_ in conn_types_open
-        and conn.b_id in corr_list
-    ] + [
-        (conn.a_id)
-        for conn in model.room_connections
-        if conn.b_id in living_list
-        and conn.type_ in conn_types_open
-        and conn.a_id in corr_list
+    zones = open_zones(model)
+    open_list = [
+        room for living in living_list for room in zones.open_neighbors(living)
     ]
+    fun_corr1 = [room for room in open_list if not room in ancill_list]
+    fun_corr2 = [room for room in open_list if room in corr_list]
 
     if fun_corr1 or fun_corr2:
         return ("dna41", "dna43")
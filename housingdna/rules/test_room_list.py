@@ -18,6 +18,7 @@ if __name__ == "__main__" and __package__ is None:
 
 
 import networkx as nx
+from dataclasses import replace
 import housingdna.file as hdna
 from itertools import chain
 from typing import List, Tuple, Dict, Mapping, Sequence, Set
@@ -58,7 +59,6 @@ from .attribute import (
     room_outmost_win_count,
     dna68_window_interior,
     dna67_Windows_overlooking_Life,
-    analyze_sun_order,
 )
 from .room_network import (
     dnas_room_network,
@@ -72,6 +72,7 @@ from .glazing_network import (
     dnas_glazing_network,
     dna37_indoor_for_sunlight,
     dna52_bedroom_for_sunlight,
+    analyze_sun_order,
 )
 from .test_complex import dnas_complex
 from housingdna.rules import edges
@@ -114,9 +115,10 @@ outmost_room = [
     if room.glazing_id in outmost_list
 ]
 
-G: nx.DiGraph = nx.DiGraph()
+# without the relations, as with the empty sun graph this list was made with
+unlit_model = replace(model, room_glazing_relations=())
 sun_dict = {
-    room.element_id: analyze_sun_order(G, outmost_list, room.element_id)
+    room.element_id: analyze_sun_order(unlit_model, room.element_id)
     for room in model.rooms
 }
 sunlit_order: int = 3
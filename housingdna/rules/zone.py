@@ -0,0 +1,86 @@
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+from ..model import House, RevitObject
+from .cache import house_cache
+from .graph import UnionFind
+
+
+class OpenZones:
+    """Rooms of a house partitioned into open-plan zones.
+
+    A zone is a group of rooms joined by open connections (room separation
+    lines, with no wall or door between them), like a living-dining-kitchen.
+    A room with no open connection is a zone of its own.
+    Zones are numbered from 0, in the order of their first room.
+
+    >>> zones = OpenZones([1, 2, 3, 4], [(1, 2), (2, 3)])
+    >>> zones.labels
+    array([0, 0, 0, 1])
+    >>> zones.zone_of(3), zones.members(0), zones.sizes
+    (0, [1, 2, 3], array([3, 1]))
+    >>> zones.open_neighbors(2)
+    [1, 3]
+    >>> sun = {1: 1, 2: 1, 3: 4, 4: 9}
+    >>> zones.zone_min(sun), zones.zone_max(sun)
+    (array([1, 9]), array([4, 9]))
+    """
+
+    def __init__(self, rooms: Iterable[int], pairs: Iterable[Tuple[int, int]]):
+        sets = UnionFind(rooms)
+        self.neighbors: Dict[int, List[int]] = {}
+        for a, b in pairs:
+            sets.union(a, b)
+            self.neighbors.setdefault(a, []).append(b)
+            self.neighbors.setdefault(b, []).append(a)
+
+        self.nodes: List[int] = list(sets.parents)
+        self.index: Dict[int, int] = {node: i for i, node in enumerate(self.nodes)}
+        roots = [sets.find(node) for node in self.nodes]
+        firsts: Dict[int, int] = {}
+        self.labels: np.ndarray = np.array(
+            [firsts.setdefault(root, len(firsts)) for root in roots], dtype=np.int64
+        )
+        self.sizes: np.ndarray = np.bincount(self.labels, minlength=len(firsts))
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def zone_of(self, room: int) -> int:
+        return int(self.labels[self.index[room]])
+
+    def members(self, zone: int) -> List[int]:
+        return [self.nodes[i] for i in np.flatnonzero(self.labels == zone)]
+
+    def open_neighbors(self, room: int) -> List[int]:
+        """Rooms openly connected to the room, once for each connection."""
+        return self.neighbors.get(room, [])
+
+    def zone_min(self, values: Mapping[int, int]) -> np.ndarray:
+        """The smallest value among the rooms of each zone."""
+        return self._reduce(np.minimum, values)
+
+    def zone_max(self, values: Mapping[int, int]) -> np.ndarray:
+        """The largest value among the rooms of each zone."""
+        return self._reduce(np.maximum, values)
+
+    def _reduce(self, ufunc: np.ufunc, values: Mapping[int, int]) -> np.ndarray:
+        array = np.array([values[node] for node in self.nodes])
+        out = np.zeros(len(self), dtype=array.dtype)
+        # every zone has a room, so the first room starts each zone
+        out[self.labels[::-1]] = array[::-1]
+        ufunc.at(out, self.labels, array)
+        return out
+
+
+@house_cache
+def open_zones(model: House) -> OpenZones:
+    return OpenZones(
+        (room.element_id for room in model.rooms),
+        (
+            (conn.a_id, conn.b_id)
+            for conn in model.room_connections
+            if conn.type_ == RevitObject.ROOM_SEPARATION_LINE
+        ),
+    )
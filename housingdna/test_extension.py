@@ -0,0 +1,211 @@
+if __name__ == "__main__" and __package__ is None:
+    # set relative import path
+    import sys
+    import pathlib
+
+    dir_level = 1
+
+    assert dir_level >= 1
+    file_path = pathlib.PurePath(__file__)
+    sys.path.append(str(file_path.parents[dir_level]))
+
+    package_path = ""
+    for level in range(dir_level - 1, 0 - 1, -1):
+        package_path += file_path.parents[level].name
+        if level > 0:
+            package_path += "."
+    __package__ = package_path
+
+
+import math
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import housingdna.file as hdna
+from housingdna.extension import get_model
+from housingdna.model import House, RevitInfo, RevitObject
+
+SIZE = 10.0  # of a room on the grid, in feet
+
+
+def box_ring(x0: float, y0: float, x1: float, y1: float) -> List[Tuple[float, float]]:
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+
+def grid_plan(
+    rooms: List[int], true_north: float, holes: bool = False
+) -> Tuple[RevitInfo, Dict[int, Tuple[int, int]]]:
+    """Rooms laid out on a grid, with a hole in every third room."""
+    columns = max(1, math.ceil(math.sqrt(len(rooms))))
+    cells = {room: (i % columns, i // columns) for i, room in enumerate(rooms)}
+    r = RevitInfo(true_north=true_north, rooms=list(rooms))
+    for k, (room, (i, j)) in enumerate(cells.items()):
+        x0, y0 = i * SIZE, j * SIZE
+        r.names[room] = f"room {room}"
+        r.heights[room] = 8.0
+        r.boundaries[room] = [box_ring(x0, y0, x0 + SIZE, y0 + SIZE)]
+        if holes and k % 3 == 0:
+            r.boundaries[room].append(box_ring(x0 + 0.5, y0 + 1, x0 + 3, y0 + 3))
+    return r, cells
+
+
+def shared_edge(
+    a: Tuple[int, int], b: Tuple[int, int]
+) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+    """Edge between two cells if they are next to each other, or else the
+    south edge of the first."""
+    (i, j), (k, l) = a, b
+    if abs(i - k) + abs(j - l) == 1:
+        x, y = max(i, k) * SIZE, max(j, l) * SIZE
+        if i != k:
+            return (x, j * SIZE), (x, (j + 1) * SIZE)
+        return (i * SIZE, y), ((i + 1) * SIZE, y)
+    return (i * SIZE, j * SIZE), ((i + 1) * SIZE, j * SIZE)
+
+
+def plan_of_house(house: House, true_north: float) -> RevitInfo:
+    """A plan with the rooms of a saved house on a grid, and its glazings
+    between the same rooms."""
+    rooms = sorted(room.element_id for room in house.rooms)
+    r, cells = grid_plan(rooms, true_north, holes=True)
+    rel_rooms: Dict[int, List[int]] = {}
+    for rel in house.room_glazing_relations:
+        rel_rooms.setdefault(rel.glazing_id, []).append(rel.room_id)
+    for glazing in house.glazings:
+        related = sorted(set(rel_rooms.get(glazing.element_id, ())) & set(cells))
+        if not related:
+            continue
+        start, end = shared_edge(cells[related[0]], cells[related[-1]])
+        r.rel_rooms[glazing.element_id] = set(related)
+        if glazing.type_ == RevitObject.ROOM_SEPARATION_LINE:
+            r.separation_lines.append(glazing.element_id)
+            r.lines[glazing.element_id] = [start, end]
+        else:
+            if glazing.type_ == RevitObject.DOOR:
+                r.doors.append(glazing.element_id)
+                r.transparencies[glazing.element_id] = 100
+            else:
+                r.windows.append(glazing.element_id)
+            r.points[glazing.element_id] = (
+                (start[0] + end[0]) / 2,
+                (start[1] + end[1]) / 2,
+            )
+    return r
+
+
+def bent_plan(seed: int) -> RevitInfo:
+    """Rooms with holes, and curtain walls bent out of their south edges."""
+    rnd = random.Random(seed)
+    rooms = list(range(1, 10))
+    r, cells = grid_plan(rooms, rnd.choice([0.0, 0.3, math.pi / 8]), holes=True)
+    for k, (room, (i, j)) in enumerate(cells.items()):
+        x0, y0 = i * SIZE, j * SIZE
+        id_ = 100 + k
+        r.curtain_walls.append(id_)
+        r.rel_rooms[id_] = {room}
+        bulge = rnd.uniform(0.1, 2)
+        # an arc of 33 points, or a wall with a kink
+        r.lines[id_] = (
+            [
+                (x0 + SIZE * t, y0 - bulge * math.sin(math.pi * t))
+                for t in (n / 32 for n in range(33))
+            ]
+            if k % 2
+            else [(x0, y0), (x0 + SIZE / 3, y0 - bulge), (x0 + SIZE, y0 - 0.01)]
+        )
+        id_ = 200 + k
+        r.windows.append(id_)
+        r.rel_rooms[id_] = {room}
+        # on the west wall, next to the hole if any
+        r.points[id_] = (x0, y0 + rnd.uniform(0, 4))
+    return r
+
+
+def door_plan(related: bool) -> RevitInfo:
+    """Two rooms side by side with a door between them, and a window on the
+    south of each, the door related to its rooms by Revit or not."""
+    r, cells = grid_plan([1, 2], 0.0)
+    start, end = shared_edge(cells[1], cells[2])
+    r.doors.append(10)
+    r.transparencies[10] = 100
+    r.points[10] = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2)
+    if related:
+        r.rel_rooms[10] = {1, 2}
+    for room, (i, j) in cells.items():
+        r.windows.append(20 + room)
+        r.rel_rooms[20 + room] = {room}
+        r.points[20 + room] = ((i + 0.5) * SIZE, j * SIZE)
+    return r
+
+
+def compare_located() -> None:
+    """Checks that a door without rooms from Revit connects the rooms around
+    it once located, as the door with the rooms set does."""
+    expected = get_model(door_plan(related=True))
+    assert expected.room_connections
+    assert not get_model(door_plan(related=False)).room_connections
+    for analytic in [False, True]:
+        model = get_model(door_plan(related=False), analytic=analytic, locate=True)
+        assert model.room_connections == expected.room_connections
+        assert model.room_glazing_relations == expected.room_glazing_relations
+
+
+def compare_facings(r: RevitInfo) -> int:
+    """Checks the facings from the analytic path against those from shapely,
+    and returns the number of relations compared."""
+
+    def facings(model: House) -> Dict[Tuple[int, int], Tuple[int, ...]]:
+        return {
+            (rel.room_id, rel.glazing_id): tuple(d.value for d in rel.facings)
+            for rel in model.room_glazing_relations
+        }
+
+    expected = facings(get_model(r))
+    analytic = facings(get_model(r, analytic=True))
+    for pair in expected.keys() | analytic.keys():
+        assert expected.get(pair) == analytic.get(pair), (
+            pair,
+            expected.get(pair),
+            analytic.get(pair),
+        )
+    return len(expected)
+
+
+def compare_workers(r: RevitInfo, workers: int = 2) -> None:
+    """Checks the house from a process pool against the one from a single
+    process, down to the order and facings of the relations."""
+
+    def relations(model: House) -> List[Tuple[int, int, Tuple[int, ...]]]:
+        return [
+            (rel.room_id, rel.glazing_id, tuple(d.value for d in rel.facings))
+            for rel in model.room_glazing_relations
+        ]
+
+    for analytic in [False, True]:
+        expected = get_model(r, analytic=analytic)
+        model = get_model(r, analytic=analytic, workers=workers)
+        assert model == expected
+        assert relations(model) == relations(expected)
+
+
+if __name__ == "__main__":
+    compare_located()
+    compare_workers(
+        plan_of_house(
+            hdna.get_model(
+                Path(__file__).parent / "models/Korea_01_위례자연앤셑트럴자이_98.79(완성).json"
+            ),
+            0.3,
+        )
+    )
+
+    n_relations = 0
+    for path in sorted((Path(__file__).parent / "models").glob("*.json")):
+        for true_north in [0.0, 0.3, math.pi / 8]:
+            n_relations += compare_facings(
+                plan_of_house(hdna.get_model(path), true_north)
+            )
+    for seed in range(20):
+        n_relations += compare_facings(bent_plan(seed))
+    print(f"same facings on both paths, for {n_relations} relations")